@@ -56,6 +56,34 @@ def fft(nums, roots, forward=True):
             nums[i] /= n
     return nums   
 
+# Stockham autosort variant. Each pass reads one array and writes the other in
+# an order which leaves the result in natural order, so there is no bit
+# reversal. work is a scratch array of the same length as nums.
+def fft_stockham(nums, work, roots, forward=True):
+    n = len(nums)
+    m = int(math.log(n)/math.log(2))
+    half = n >> 1
+    x, y = nums, work
+    s = 1
+    for l in range(m - 1, -1, -1):
+        c = roots[l]
+        if forward:
+            c = c.real -c.imag*1j
+        u = 0j+1
+        for p in range(half//s):
+            for q in range(s):
+                a = x[q + s*p]
+                b = x[q + s*p + half]
+                y[q + 2*s*p] = a + b
+                y[q + 2*s*p + s] = (a - b)*u
+            u *= c
+        x, y = y, x
+        s <<= 1
+    # Result is in x: copy back if the no. of passes was odd
+    for i in range(n):
+        nums[i] = x[i]/n if forward else x[i]
+    return nums
+
 def buildarrays(length):
     bits = int(math.log(length)/math.log(2))
     roots = []
@@ -78,15 +106,19 @@ def printlist(q):
         s += "[{:5.2f}{:5.2f}] ".format(t.real, t.imag)
     print(s)
 
-nums, roots = buildarrays(16)
-for x in range(len(nums)):
-    nums[x] = 0.1+ math.cos(2*math.pi*x/len(nums))
-print("Initial")
-printlist(nums)
-fft(nums, roots, True)
-print("fft") 
-printlist(nums)
-print("Reverse transform")
-fft(nums, roots, False)
-printlist(nums)
+def demo():
+    nums, roots = buildarrays(16)
+    for x in range(len(nums)):
+        nums[x] = 0.1+ math.cos(2*math.pi*x/len(nums))
+    print("Initial")
+    printlist(nums)
+    fft(nums, roots, True)
+    print("fft") 
+    printlist(nums)
+    print("Reverse transform")
+    fft(nums, roots, False)
+    printlist(nums)
 
+# Importing the module (e.g. as a reference for dftaccuracy.py) is silent
+if __name__ == '__main__':
+    demo()
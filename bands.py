@@ -0,0 +1,174 @@
+# bands.py Octave and fractional octave band levels
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Sums the power in the bins of a forward transform into 1/1 or 1/b octave
+# bands. Band mid frequencies and edges are base 10 as per IEC 61260:
+# mid frequency = 1000 * G**(x/b), edges = mid * G**(+-1/(2b)) where G = 10**0.3.
+# Bin k covers k*df +- df/2 where df is the bin spacing: a bin straddling a band
+# edge contributes to both bands in proportion to its overlap. A or C frequency
+# weighting (IEC 61672) is evaluated at each bin's frequency and folded into
+# the coefficients. The tables are computed once for a given length, sample
+# rate and band specification and are cached. Levels are computed in a single
+# assembler pass over the tables.
+
+import array
+import math
+from uctypes import addressof
+from window import setarray
+
+Z = const(0)    # No frequency weighting
+A = const(1)    # A weighting
+C = const(2)    # C weighting
+
+G = 10**0.3     # Octave frequency ratio
+
+# Sum weighted bin powers into bands.
+# r0: integer control array
+# ctrl[0] = No. of table entries
+# ctrl[1] = address of real array
+# ctrl[2] = address of imaginary array
+# ctrl[3] = address of bin numbers ('H' array)
+# ctrl[4] = address of band numbers ('H' array)
+# ctrl[5] = address of coefficients (float)
+# ctrl[6] = address of band power array (float): must be zeroed
+# ctrl[7] = 1 if data is polar (power = re**2) else cartesian (re**2 + im**2)
+@micropython.asm_thumb
+def bandsum(r0):
+    push({r8})              # Callee saved
+    ldr(r1, [r0, 28])
+    mov(r8, r1)             # Polar flag
+    ldr(r1, [r0, 4])
+    ldr(r2, [r0, 8])
+    ldr(r3, [r0, 12])
+    ldr(r4, [r0, 16])
+    ldr(r5, [r0, 20])
+    ldr(r6, [r0, 24])
+    ldr(r0, [r0, 0])
+    label(LOOP)
+    ldrh(r7, [r3, 0])       # Bin
+    lsl(r7, r7, 2)
+    add(r7, r1, r7)
+    vldr(s0, [r7, 0])
+    vmul(s0, s0, s0)        # re**2
+    mov(r7, r8)
+    cmp(r7, 0)
+    bne(POLAR)
+    ldrh(r7, [r3, 0])
+    lsl(r7, r7, 2)
+    add(r7, r2, r7)
+    vldr(s1, [r7, 0])
+    vmul(s1, s1, s1)
+    vadd(s0, s0, s1)        # + im**2
+    label(POLAR)
+    vldr(s1, [r5, 0])
+    vmul(s0, s0, s1)        # Weighted power
+    ldrh(r7, [r4, 0])       # Band
+    lsl(r7, r7, 2)
+    add(r7, r6, r7)
+    vldr(s1, [r7, 0])
+    vadd(s1, s1, s0)
+    vstr(s1, [r7, 0])
+    add(r3, 2)
+    add(r4, 2)
+    add(r5, 4)
+    sub(r0, 1)
+    bgt(LOOP)
+    pop({r8})
+
+# Frequency weighting as a power ratio (IEC 61672 analytical expressions)
+def weight(f, weighting):
+    if weighting == Z:
+        return 1.0
+    f2 = f*f
+    if weighting == A:
+        r = 12194**2*f2*f2/((f2 + 20.6**2)*math.sqrt((f2 + 107.7**2)*(f2 + 737.9**2))
+                            *(f2 + 12194**2))
+        return r*r*10**0.2     # +2.0dB normalises to 0dB at 1kHz
+    r = 12194**2*f2/((f2 + 20.6**2)*(f2 + 12194**2))
+    return r*r*10**0.006       # C: +0.06dB
+
+# Compute tables: band mid frequencies, bin numbers, band numbers, coefficients.
+# fmin and fmax select the bands whose exact mid frequencies are nearest to them
+# so that nominal values (e.g. 20Hz for 19.95Hz) select the intended bands. If
+# fmin is None the range starts at 20Hz, skipping any bands below the first bin.
+def _tables(length, rate, fraction, fmin, fmax, weighting):
+    df = rate/length
+    nyquist = rate/2
+    b = fraction
+    x = round(b*math.log((20 if fmin is None else fmin)/1000)/math.log(G))  # First band index
+    last = round(b*math.log(fmax/1000)/math.log(G))
+    centres = []
+    bins = []
+    bands = []
+    coeffs = []
+    while x <= last:
+        fm = 1000*G**(x/b)
+        fl = fm*G**(-0.5/b)
+        fu = fm*G**(0.5/b)
+        if fu > nyquist:
+            break
+        if fmin is None and fu <= df/2:
+            x += 1
+            continue
+        band = len(centres)
+        centres.append(fm)
+        nbins = len(bins)
+        for k in range(max(1, int(fl/df + 0.5)), min(length//2, int(fu/df + 0.5) + 1)):
+            overlap = min(fu, (k + 0.5)*df) - max(fl, (k - 0.5)*df)
+            if overlap > 0:
+                bins.append(k)
+                bands.append(band)
+                coeffs.append(overlap/df*weight(k*df, weighting))
+        if len(bins) == nbins:  # bandsum() would report the floor
+            raise ValueError('No bins in {:.1f}Hz band: increase length or fmin'.format(fm))
+        x += 1
+    if not centres:
+        raise ValueError('No bands in range')
+    return (centres, array.array('H', bins), array.array('H', bands),
+            array.array('f', coeffs))
+
+_cache = {}
+
+class Bands:
+    # dft: DFT instance. rate: sample rate. fraction: 1 for octave, 3 for 1/3
+    # octave bands etc. fmin, fmax: range of band mid frequencies, each rounded
+    # to the nearest band: default 20Hz (or the lowest band containing bins) to
+    # the highest band below the Nyquist frequency. Raises ValueError if a band
+    # contains no bins.
+    def __init__(self, dft, rate, fraction=1, fmin=None, fmax=None, weighting=Z):
+        self.dft = dft
+        if fmax is None:
+            fmax = rate/2
+        key = (dft.length, rate, fraction, fmin, fmax, weighting)
+        if key not in _cache:
+            _cache[key] = _tables(*key)
+        self.centres, bins, bands, coeffs = _cache[key]
+        nbands = len(self.centres)
+        self.levels = array.array('f', (0 for _ in range(nbands)))
+        self._ctrl = array.array('i', [len(bins), addressof(dft.re), addressof(dft.im),
+                                       addressof(bins), addressof(bands), addressof(coeffs),
+                                       addressof(self.levels), 0])
+        # Correct for the equivalent noise bandwidth of any window: a sinewave
+        # in a band then has the level of its peak bin in a DB conversion.
+        enbw = 1.0
+        wd = dft.windata
+        if wd is not None:
+            n = len(wd)
+            enbw = n*sum(w*w for w in wd)/sum(wd)**2
+        self._scale = 1/enbw
+
+    # Compute band levels in dB after a FORWARD conversion (or POLAR if polar is
+    # True). Returns the levels array which is also a bound variable.
+    def run(self, polar=False):
+        levels = self.levels
+        setarray(levels, 0, len(levels))
+        ctrl = self._ctrl
+        ctrl[1] = addressof(self.dft.re)  # The DFT may have attached other buffers
+        ctrl[2] = addressof(self.dft.im)
+        ctrl[7] = 1 if polar else 0
+        bandsum(ctrl)
+        offs = self.dft.dboffset
+        for idx, p in enumerate(levels):
+            levels[idx] = -80.0 if p <= 0.0 else 10*math.log10(p*self._scale) - offs
+        return levels
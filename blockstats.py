@@ -0,0 +1,106 @@
+# blockstats.py Block statistics and Goertzel kernels used by trigger.py
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Pure Python versions are in dftpy.py.
+
+# Statistics of a block of integer samples relative to an offset K.
+# r0: integer control array
+# ctrl[0] = no. of samples
+# ctrl[1] = address of sample array (32 bit integers)
+# ctrl[2] = address of float results: sum(x - K), sum((x - K)**2), max - K, min - K
+# ctrl[3] = K
+@micropython.asm_thumb
+def blockstats(r0):
+    ldr(r1, [r0, 0])
+    ldr(r2, [r0, 4])
+    ldr(r7, [r0, 12])       # K
+    mov(r3, 0)
+    vmov(s0, r3)            # Sum
+    vmov(s1, r3)            # Sum of squares
+    ldr(r4, [r2, 0])        # Max
+    mov(r5, r4)             # Min
+    label(LOOP)
+    ldr(r6, [r2, 0])
+    cmp(r6, r4)
+    ble(NOTMAX)
+    mov(r4, r6)
+    label(NOTMAX)
+    cmp(r6, r5)
+    bge(NOTMIN)
+    mov(r5, r6)
+    label(NOTMIN)
+    sub(r6, r6, r7)
+    vmov(s2, r6)
+    vcvt_f32_s32(s2, s2)
+    vadd(s0, s0, s2)
+    vmul(s2, s2, s2)
+    vadd(s1, s1, s2)
+    add(r2, 4)
+    sub(r1, 1)
+    bgt(LOOP)
+    ldr(r3, [r0, 8])
+    vstr(s0, [r3, 0])
+    vstr(s1, [r3, 4])
+    sub(r4, r4, r7)
+    vmov(s2, r4)
+    vcvt_f32_s32(s2, s2)
+    vstr(s2, [r3, 8])
+    sub(r5, r5, r7)
+    vmov(s2, r5)
+    vcvt_f32_s32(s2, s2)
+    vstr(s2, [r3, 12])
+
+# Goertzel algorithm: sum of the powers of a block of integer samples at one or
+# more frequencies. For each frequency s[n] = x[n] - K + c*s[n-1] - s[n-2] with
+# power s[N-1]**2 + s[N-2]**2 - c*s[N-1]*s[N-2] where c = 2*cos(2*pi*f/rate).
+# r0: integer control array
+# ctrl[0] = no. of samples
+# ctrl[1] = address of sample array (32 bit integers)
+# ctrl[2] = address of coefficient float array
+# ctrl[3] = K
+# ctrl[4] = no. of frequencies
+# ctrl[5] = address of float result
+@micropython.asm_thumb
+def goertzel(r0):
+    ldr(r1, [r0, 12])
+    vmov(s14, r1)
+    vcvt_f32_s32(s14, s14)  # K
+    mov(r1, 0)
+    vmov(s15, r1)           # Total power
+    ldr(r3, [r0, 8])
+    ldr(r4, [r0, 16])
+    label(FREQ)
+    vldr(s0, [r3, 0])       # c
+    mov(r1, 0)
+    vmov(s1, r1)            # s[n-1]
+    vmov(s2, r1)            # s[n-2]
+    ldr(r1, [r0, 0])
+    ldr(r2, [r0, 4])
+    label(SAMPLE)
+    ldr(r5, [r2, 0])
+    vmov(s3, r5)
+    vcvt_f32_s32(s3, s3)
+    vsub(s3, s3, s14)
+    vmul(s4, s0, s1)
+    vadd(s3, s3, s4)
+    vsub(s3, s3, s2)
+    vmov(r5, s1)
+    vmov(s2, r5)
+    vmov(r5, s3)
+    vmov(s1, r5)
+    add(r2, 4)
+    sub(r1, 1)
+    bgt(SAMPLE)
+    vmul(s3, s1, s1)
+    vmul(s4, s2, s2)
+    vadd(s3, s3, s4)
+    vmul(s4, s1, s2)
+    vmul(s4, s4, s0)
+    vsub(s3, s3, s4)
+    vadd(s15, s15, s3)
+    add(r3, 4)
+    sub(r4, 1)
+    bgt(FREQ)
+    ldr(r5, [r0, 20])
+    vstr(s15, [r5, 0])
@@ -0,0 +1,116 @@
+# decimate.py Decimation by a power of two using cascaded half-band filters
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Enables data to be acquired at a high sample rate and reduced to a short frame
+# for analysis. Each stage applies a half-band FIR lowpass filter and discards
+# alternate samples. A half-band filter has a cutoff of a quarter of its input
+# sample rate and every second coefficient other than the central one is zero,
+# so a filter of 4*k - 1 taps requires only k + 1 multiplies per output sample.
+# Stages operate in place on the capture buffer: no allocation occurs after
+# construction.
+# With the default k = 8 (31 taps, Blackman window) each stage has a passband
+# flat to within 0.05dB up to 0.34 of its output sample rate and attenuates
+# components which would alias into that band by at least 60dB. At 1/3 of the
+# output rate the attenuation is 69dB, hence bins 0 to N/3 of a subsequent N
+# point transform are valid. Attenuation falls to 45dB at 0.365. See
+# dftaccuracy.decimation().
+
+import array
+import math
+from uctypes import addressof
+
+# Half-band decimating filter. Output sample i is the filter applied to input
+# samples 2*i to 2*i + 4*k - 2, so source and destination may be the same array.
+# r0: integer control array
+# ctrl[0] = no. of output samples
+# ctrl[1] = address of source float array
+# ctrl[2] = address of destination float array
+# ctrl[3] = address of coefficient float array: centre, h[1], h[3] .. h[2k-1]
+# ctrl[4] = k
+@micropython.asm_thumb
+def halfband(r0):
+    ldr(r5, [r0, 0])
+    ldr(r1, [r0, 4])
+    ldr(r2, [r0, 8])
+    ldr(r3, [r0, 12])
+    ldr(r4, [r0, 16])
+    lsl(r0, r4, 3)
+    add(r1, r1, r0)
+    sub(r1, 4)              # r1 -> centre tap at offset 2k - 1
+    label(OUTER)
+    vldr(s0, [r3, 0])       # Centre coefficient
+    vldr(s1, [r1, 0])
+    vmul(s2, s0, s1)        # Accumulator
+    add(r3, 4)
+    mov(r0, r4)             # k symmetric pairs
+    sub(r6, r1, 4)
+    add(r7, r1, 4)
+    label(INNER)
+    vldr(s3, [r6, 0])
+    vldr(s4, [r7, 0])
+    vadd(s3, s3, s4)        # Symmetric samples
+    vldr(s4, [r3, 0])
+    vmul(s3, s3, s4)
+    vadd(s2, s2, s3)
+    sub(r6, 8)
+    add(r7, 8)
+    add(r3, 4)
+    sub(r0, 1)
+    bgt(INNER)
+    vstr(s2, [r2, 0])
+    add(r2, 4)
+    add(r1, 8)              # Advance input by two samples
+    lsl(r0, r4, 2)
+    add(r0, 4)
+    sub(r3, r3, r0)         # Restore coefficient pointer
+    sub(r5, 1)
+    bgt(OUTER)
+
+# Coefficients of a 4*k - 1 tap half-band filter: windowed sinc with Blackman
+# window normalised for unity gain at DC. Returns the nonzero coefficients in the
+# order required by halfband().
+def design(k):
+    half = 2*k - 1                  # Taps either side of centre
+    taps = 4*k - 1
+    coeffs = array.array('f', (0 for _ in range(k + 1)))
+    total = 0.5
+    for m in range(k + 1):
+        n = 2*m - 1 if m else 0     # Offset from centre
+        x = 2*math.pi*(n + half + 1)/(taps + 1)
+        w = 0.42 - 0.5*math.cos(x) + 0.08*math.cos(2*x)
+        h = 0.5 if n == 0 else w*math.sin(math.pi*n/2)/(math.pi*n)
+        coeffs[m] = h
+        if n:
+            total += 2*h
+    for m in range(k + 1):
+        coeffs[m] /= total
+    return coeffs
+
+# Decimate by factor (a power of 2) to produce length samples. The capture
+# buffer must hold capture (> factor*length) samples as floats: the first
+# capture - factor*length samples are consumed by the filters' settling.
+class Decimator:
+    def __init__(self, length, factor, k=8):
+        stages = round(math.log(factor)/math.log(2))
+        assert factor > 1 and 2**stages == factor, "Factor must be a power of two"
+        self.factor = factor
+        self.coeffs = design(k)
+        ntaps = 4*k - 1
+        nout = [length]                 # Output samples of each stage, last first
+        for _ in range(stages - 1):
+            nout.append(2*(nout[-1] - 1) + ntaps)
+        self.capture = 2*(nout[-1] - 1) + ntaps
+        nout.reverse()
+        self._nout = nout
+        self._ctrls = [array.array('i', [n, 0, 0, addressof(self.coeffs), k]) for n in nout]
+
+    # Decimate floats in buf to dest. buf is overwritten.
+    def run(self, buf, dest):
+        ctrls = self._ctrls
+        for ctrl in ctrls:
+            ctrl[1] = addressof(buf)
+            ctrl[2] = addressof(buf)
+        ctrls[-1][2] = addressof(dest)
+        for ctrl in ctrls:
+            halfband(ctrl)
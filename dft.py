@@ -404,8 +404,244 @@ def fft(r0, r1):        # r0 adress of scratchpad, r1 = Control: see above
     add(r1, 4)
     add(r2, 4)
     sub(r4, 1)
-    cmp(r4, 0)
-    bge(SCALE01)        #                       ** ! for i in range(n):
+    bgt(SCALE01)        #                       ** ! for i in range(n):
     label(DFTDONE)
     pop({r8, r9, r10})
 
+# ********* STOCKHAM AUTOSORT TRANSFORM *********
+# Alternative to fft() with the same arguments and results. Each pass reads one
+# pair of arrays and writes the other so that the result emerges in natural
+# order: there is no bit reversal pass and all accesses are sequential. Needs
+# scratch arrays of the transform length, their addresses in ctrl[6] and
+# ctrl[7]. See algorithms.fft_stockham(). If the no. of passes is odd the result
+# is copied back, scaling forward transforms in the same loop.
+# Register usage
+# r0 &x[q + s*p] (real)      r1 &y[q + 2*s*p] (real)
+# r2 x imag - x real         r3 y imag - y real
+# r4 half length in bytes    r5 stride s in bytes
+# r6 q counter               r7 temporary
+# r8 y real base             r9 address of root of unity for this pass
+# r10 control                r11 x real base
+# s0, s1 twiddle w           s2, s3 root of unity
+@micropython.asm_thumb
+def stockham(r0, r1):
+    push({r8, r9, r10, r11})
+    push({r0})
+    mov(r10, r1)            # Control (forward = 1)
+    ldr(r4, [r0, 0])
+    lsl(r4, r4, 1)          # Half length in bytes
+    ldr(r1, [r0, 8])        # x = data arrays
+    mov(r11, r1)
+    ldr(r2, [r0, 12])
+    sub(r2, r2, r1)
+    ldr(r1, [r0, 24])       # y = scratch arrays
+    mov(r8, r1)
+    ldr(r3, [r0, 28])
+    sub(r3, r3, r1)
+    ldr(r7, [r0, 20])       # &cmplx
+    ldr(r6, [r0, 16])
+    add(r7, r7, r6)         # &roots[0]
+    ldr(r6, [r0, 4])
+    sub(r6, 1)
+    lsl(r6, r6, 3)
+    add(r7, r7, r6)         # &roots[bits - 1]
+    mov(r9, r7)
+    mov(r5, 4)              # s = 1
+    label(STAGE)
+    mov(r7, r9)
+    vldr(s2, [r7, 0])       # c = roots[l]
+    vldr(s3, [r7, 4])
+    sub(r7, 8)
+    mov(r9, r7)
+    mov(r7, r10)
+    mov(r6, 1)
+    tst(r7, r6)
+    beq(NOCONJ)
+    vneg(s3, s3)            # Conjugate if forward
+    label(NOCONJ)
+    vmov(s0, r6)
+    vcvt_f32_s32(s0, s0)    # w = 1 + j0
+    mov(r6, 0)
+    vmov(s1, r6)
+    mov(r0, r11)
+    mov(r1, r8)
+    label(PLOOP)            # for p in range(half//s)
+    lsr(r6, r5, 2)
+    label(QLOOP)            # for q in range(s)
+    vldr(s4, [r0, 0])       # a = x[q + s*p]
+    add(r7, r0, r2)
+    vldr(s5, [r7, 0])
+    add(r7, r0, r4)
+    vldr(s6, [r7, 0])       # b = x[q + s*p + half]
+    add(r7, r7, r2)
+    vldr(s7, [r7, 0])
+    vadd(s8, s4, s6)        # y[q + 2*s*p] = a + b
+    vstr(s8, [r1, 0])
+    vadd(s9, s5, s7)
+    add(r7, r1, r3)
+    vstr(s9, [r7, 0])
+    vsub(s10, s4, s6)       # d = a - b
+    vsub(s11, s5, s7)
+    vmul(s12, s10, s0)      # y[q + 2*s*p + s] = d*w
+    vmul(s13, s11, s1)
+    vsub(s12, s12, s13)
+    vmul(s13, s10, s1)
+    vmul(s14, s11, s0)
+    vadd(s13, s13, s14)
+    add(r7, r1, r5)
+    vstr(s12, [r7, 0])
+    add(r7, r7, r3)
+    vstr(s13, [r7, 0])
+    add(r0, 4)
+    add(r1, 4)
+    sub(r6, 1)
+    bgt(QLOOP)
+    add(r1, r1, r5)         # Skip the block written via d*w
+    vmul(s12, s0, s2)       # w *= c
+    vmul(s13, s1, s3)
+    vsub(s12, s12, s13)
+    vmul(s13, s0, s3)
+    vmul(s14, s1, s2)
+    vadd(s1, s13, s14)
+    vmov(r7, s12)
+    vmov(s0, r7)
+    mov(r7, r11)
+    sub(r7, r0, r7)
+    cmp(r7, r4)
+    blt(PLOOP)
+    mov(r7, r11)            # Swap x and y
+    mov(r11, r8)
+    mov(r8, r7)
+    mov(r7, r2)
+    mov(r2, r3)
+    mov(r3, r7)
+    lsl(r5, r5, 1)          # s <<= 1
+    cmp(r5, r4)
+    ble(STAGE)
+# Result is in x. Copy to the data arrays if necessary, scaling if forward.
+    pop({r0})
+    ldr(r6, [r0, 0])        # Length
+    ldr(r1, [r0, 8])        # &real
+    ldr(r3, [r0, 12])       # &imag
+    ldr(r7, [r0, 20])
+    vldr(s15, [r7, 48])     # Multiplier
+    mov(r7, r10)
+    mov(r5, 1)
+    tst(r7, r5)
+    bne(FINAL)              # Forward
+    mov(r7, r11)
+    cmp(r7, r1)
+    beq(SDONE)              # Reverse transform, result in place
+    vmov(s15, r5)
+    vcvt_f32_s32(s15, s15)  # Copy only
+    label(FINAL)
+    mov(r0, r11)
+    add(r2, r0, r2)
+    label(COPY)
+    vldr(s0, [r0, 0])
+    vmul(s0, s0, s15)
+    vstr(s0, [r1, 0])
+    vldr(s0, [r2, 0])
+    vmul(s0, s0, s15)
+    vstr(s0, [r3, 0])
+    add(r0, 4)
+    add(r1, 4)
+    add(r2, 4)
+    add(r3, 4)
+    sub(r6, 1)
+    bgt(COPY)
+    label(SDONE)
+    pop({r8, r9, r10, r11})
+
+
+# ********* REAL INVERSE TRANSFORM *********
+# A real signal of length N may be recovered from bins 0..N/2 of its spectrum
+# using an N/2 point complex transform. hermitian() combines the even and odd
+# parts of the spectrum into an N/2 point complex spectrum Z in place:
+# E[k] = X[k] + conj(X[M-k]), O[k] = (X[k] - conj(X[M-k]))*W**k, Z[k] = E[k] + jO[k]
+# where M = N/2 and W = exp(j*2*pi/N). Bins k and M-k are processed together.
+# After an M point reverse fft() the even samples are in re and the odd
+# samples in im: interleave() assembles them into re.
+# r0: integer control array
+# ctrl[0] = M (half the transform length)
+# ctrl[1] = address of real array
+# ctrl[2] = address of imaginary array
+# ctrl[3] = address of float array holding cos(2*pi/N), sin(2*pi/N)
+@micropython.asm_thumb
+def hermitian(r0):
+    ldr(r5, [r0, 0])        # M
+    ldr(r1, [r0, 4])        # &re[k]
+    ldr(r2, [r0, 8])        # &im[k]
+    ldr(r6, [r0, 12])
+    vldr(s2, [r6, 0])       # Rotation per bin
+    vldr(s3, [r6, 4])
+    lsl(r3, r5, 2)          # Byte offset of bin M
+    add(r4, r2, r3)         # &im[M-k]
+    add(r3, r1, r3)         # &re[M-k]
+    mov(r6, 1)
+    lsr(r5, r5, 1)
+    add(r5, r5, r6)         # M/2 + 1 iterations
+    vmov(s0, r6)
+    vcvt_f32_s32(s0, s0)    # W**0 = 1 + j0
+    mov(r6, 0)
+    vmov(s1, r6)
+    label(LOOP)
+    vldr(s4, [r1, 0])       # X[k]
+    vldr(s5, [r2, 0])
+    vldr(s6, [r3, 0])       # X[M-k]
+    vldr(s7, [r4, 0])
+    vadd(s8, s4, s6)        # E real
+    vsub(s9, s5, s7)        # E imag
+    vsub(s10, s4, s6)       # D = X[k] - conj(X[M-k])
+    vadd(s11, s5, s7)
+    vmul(s12, s10, s0)      # O = D * W**k
+    vmul(s13, s11, s1)
+    vsub(s12, s12, s13)     # O real
+    vmul(s13, s10, s1)
+    vmul(s14, s11, s0)
+    vadd(s13, s13, s14)     # O imag
+    vsub(s14, s8, s13)      # Z[k] = E + jO
+    vstr(s14, [r1, 0])
+    vadd(s14, s9, s12)
+    vstr(s14, [r2, 0])
+    vadd(s14, s8, s13)      # Z[M-k] = conj(E) + j*conj(O)
+    vstr(s14, [r3, 0])
+    vsub(s14, s12, s9)
+    vstr(s14, [r4, 0])
+    vmul(s14, s0, s3)       # Rotate W**k
+    vmul(s15, s1, s2)
+    vadd(s14, s14, s15)     # New imag
+    vmul(s15, s1, s3)
+    vmul(s0, s0, s2)
+    vsub(s0, s0, s15)       # New real
+    vmov(r6, s14)
+    vmov(s1, r6)
+    add(r1, 4)
+    add(r2, 4)
+    sub(r3, 4)
+    sub(r4, 4)
+    sub(r5, 1)
+    bgt(LOOP)
+
+# Interleave: re[2n] = re[n], re[2n+1] = im[n] for n in range(M). Works down
+# from the top so that no element is overwritten before it is read.
+# r0: address of real array
+# r1: address of imaginary array
+# r2: M
+@micropython.asm_thumb
+def interleave(r0, r1, r2):
+    lsl(r3, r2, 2)
+    sub(r3, 4)
+    add(r1, r1, r3)         # &im[M-1]
+    add(r4, r0, r3)         # &re[M-1]
+    add(r0, r4, r3)         # &re[2M-2]
+    label(LOOP)
+    ldr(r5, [r1, 0])
+    str(r5, [r0, 4])
+    ldr(r5, [r4, 0])
+    str(r5, [r0, 0])
+    sub(r0, 8)
+    sub(r1, 4)
+    sub(r4, 4)
+    sub(r2, 1)
+    bgt(LOOP)
@@ -0,0 +1,266 @@
+# dftaccuracy.py Accuracy/regression tests for the DFT class
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Every conversion type is compared against the pure Python reference in
+# algorithms.py. On a platform with double precision floats this is a float64
+# reference, otherwise the figures include the error of the reference itself.
+# The float (dftclass.py) and Q15 fixed point (dftfixed.py) backends are tested
+# with the same cases: the latter has its own limits. Under CPython the host
+# implementation (dfthost.py) is tested with the same cases and limits, so host
+# and device results are checked against a common reference.
+# Results are printed as a table, with a PASS/FAIL verdict against LIMITS, so
+# that speed-oriented changes to the kernels can be judged on numbers.
+
+import sys
+import math
+import cmath
+import algorithms
+if sys.implementation.name == 'micropython':
+    from dftfixed import DFT as QDFT  # Q15 fixed point backend
+    from dftclass import DFT, FORWARD, REVERSE, HREVERSE, CEPSTRUM, AUTOCORR, POLAR, DB, FAST, STANDARD, PRECISE, NOSQRT
+else:  # CPython: test the host implementation
+    QDFT = None
+    from dfthost import DFT, FORWARD, REVERSE, HREVERSE, CEPSTRUM, AUTOCORR, POLAR, DB, FAST, STANDARD, PRECISE, NOSQRT
+
+DOUBLE = 1.0 + 2**-40 != 1.0  # True if reference has float64 precision
+
+# Acceptance limits: conversion: (min SNR dB, max phase error degs)
+# The log magnitude stage of CEPSTRUM amplifies the rounding errors of bins near
+# zero (e.g. bin 0 after winapply() has removed the mean) hence its lower limit.
+LIMITS = {FORWARD: (100, 0.1),
+          REVERSE: (100, None),
+          HREVERSE: (100, None),
+          CEPSTRUM: (60, None),
+          AUTOCORR: (100, None),
+          POLAR: (100, 0.1),
+          DB: (100, 0.1),
+         }
+
+# Q15 fixed point backend: supported conversions and limits at QLENGTH points.
+# 16 bit arithmetic limits the SNR, which falls by about 3dB per doubling of
+# length: the SNR limit is adjusted by QSLOPE dB per doubling.
+QCONVERSIONS = (FORWARD, REVERSE, POLAR, DB)
+QLIMITS = {FORWARD: (50, 1.0),
+           REVERSE: (50, None),
+           POLAR: (50, 1.0),
+           DB: (50, 1.0),
+          }
+QLENGTH = 1024
+QSLOPE = 3
+
+NAMES = {FORWARD: 'FORWARD', REVERSE: 'REVERSE', HREVERSE: 'HREVERSE', POLAR: 'POLAR',
+         DB: 'DB', CEPSTRUM: 'CEPSTRUM', AUTOCORR: 'AUTOCORR'}
+
+# Bins whose reference magnitude is below peak*THRESHOLD are excluded from
+# phase and dB error figures: their phase is dominated by rounding noise. The
+# fixed point backend has a higher noise floor.
+THRESHOLD = 1e-3
+QTHRESHOLD = 1e-2
+
+def print_tests():
+    st = '''Accuracy tests for dftclass against a reference DFT.
+Available tests:
+test()  Run all conversions, lengths and windows. Print results.
+test(cls=QDFT)  As above for the Q15 fixed point backend, lengths to 4096.
+measure(conversion, length, winfunc=None)  Return results for one case.
+tiers()  Compare polar conversion precision tiers.
+decimation()  Check the response of the decimate.py half-band filter.
+'''
+    print('\x1b[32m')
+    print(st)
+    if not DOUBLE:
+        print('Warning: single precision platform. Reference is not float64.')
+    print('\x1b[39m')
+
+print_tests()
+
+# ******************** Support functions ********************
+
+# hann window with coherent gain compensated (as in dfttest.py)
+def hann(x, length):
+    return 1 - math.cos(2*math.pi*x/(length - 1))
+
+# Deterministic test signal: DC, an on-bin tone, an off-bin tone and a low
+# level of pseudo random noise.
+def signal(length):
+    seed = 1
+    data = []
+    for x in range(length):
+        seed = (seed * 1103515245 + 12345) & 0x7fffffff
+        noise = seed / 0x7fffffff - 0.5
+        data.append(1 + 2*math.sin(2*math.pi*x*(length//8)/length)
+                    + 0.5*math.cos(2*math.pi*x*(length/5 + 0.37)/length + 0.3)
+                    + 0.001*noise)
+    return data
+
+# Reference forward transform of real data including the effect of winapply()
+# which removes the mean before applying the window.
+def ref_forward(data, winfunc=None):
+    length = len(data)
+    if winfunc is not None:
+        mean = sum(data)/length
+        data = [(data[x] - mean)*winfunc(x, length) for x in range(length)]
+    nums, roots = algorithms.buildarrays(length)
+    for x in range(length):
+        nums[x] = complex(data[x], 0)
+    return algorithms.fft(nums, roots, True)
+
+def ref_reverse(spectrum):
+    nums, roots = algorithms.buildarrays(len(spectrum))
+    for x in range(len(spectrum)):
+        nums[x] = spectrum[x]
+    return algorithms.fft(nums, roots, False)
+
+def phase_diff(a, b):  # Difference of two angles in range -pi..pi
+    d = (a - b) % (2*math.pi)
+    return d - 2*math.pi if d > math.pi else d
+
+# Compare sequences of complex numbers. Returns maximum and RMS absolute error,
+# SNR in dB and maximum phase error in degrees (None if not required).
+def compare(got, ref, phase=True, threshold=THRESHOLD):
+    sig = 0.0
+    noise = 0.0
+    maxerr = 0.0
+    for g, r in zip(got, ref):
+        err = abs(g - r)
+        maxerr = max(maxerr, err)
+        sig += abs(r)**2
+        noise += err**2
+    rms = math.sqrt(noise/len(ref))
+    snr = 200.0 if noise == 0 else 10*math.log10(sig/noise)
+    return maxerr, rms, snr, phase_error(got, ref, threshold) if phase else None
+
+# Maximum phase error in degrees. Args are sequences of complex numbers or of
+# (magnitude, phase) tuples.
+def phase_error(got, ref, threshold=THRESHOLD):
+    peak = max(abs(r) for r in ref)
+    maxph = 0.0
+    for g, r in zip(got, ref):
+        if abs(r) > peak*threshold:
+            ph = g[1] if isinstance(g, tuple) else cmath.phase(g)
+            maxph = max(maxph, abs(phase_diff(ph, cmath.phase(r))))
+    return math.degrees(maxph)
+
+# ************************** TESTS **************************
+
+# Run a single case. Any keyword args are assigned to DFT instance attributes
+# before the conversion: this enables alternative kernel options to be tested.
+# Returns maxerr, rmserr, snr (dB), phase error (degs). For DB conversions
+# maxerr and rmserr are in dB.
+def measure(conversion, length, winfunc=None, cls=DFT, **kwargs):
+    threshold = QTHRESHOLD if cls is QDFT else THRESHOLD
+    data = signal(length)
+    spectrum = ref_forward(data, winfunc)
+    if conversion == REVERSE:
+        def populate(d):
+            for x in range(length):
+                d.re[x] = spectrum[x].real
+                d.im[x] = spectrum[x].imag
+        winfunc = None
+        ref = ref_reverse(spectrum)
+    elif conversion == HREVERSE:  # Only bins 0..N/2 are supplied
+        def populate(d):
+            for x in range(length//2 + 1):
+                d.re[x] = spectrum[x].real
+                d.im[x] = spectrum[x].imag
+        winfunc = None
+        ref = [complex(r.real, 0) for r in ref_reverse(spectrum)]
+    else:
+        def populate(d):
+            for x in range(length):
+                d.re[x] = data[x]
+        ref = spectrum
+        if conversion == AUTOCORR:
+            ref = [complex(r.real, 0) for r in ref_reverse([abs(z)**2 for z in spectrum])]
+        elif conversion == CEPSTRUM:
+            ref = [complex(r.real, 0) for r in
+                   ref_reverse([math.log(abs(z))/length for z in spectrum])]
+    mydft = cls(length, populate, winfunc)
+    for attr in kwargs:
+        setattr(mydft, attr, kwargs[attr])
+    mydft.run(conversion)
+    if conversion in (FORWARD, REVERSE, HREVERSE, CEPSTRUM, AUTOCORR):
+        got = [complex(mydft.re[x], mydft.im[x]) for x in range(length)]
+        return compare(got, ref, conversion == FORWARD, threshold)
+    # Polar conversions: only the first half of the arrays is valid. Errors are
+    # those of the magnitude (in dB for DB conversions) with phase separate.
+    half = length//2
+    ref = ref[:half]
+    got = [(mydft.re[x], mydft.im[x]) for x in range(half)]
+    phase = phase_error(got, ref, threshold)
+    if conversion == DB:
+        offs = mydft.dboffset
+        mags = [10**((got[x][0] + offs)/20) for x in range(half)]
+        peak = max(abs(r) for r in ref)
+        dberr = [abs(got[x][0] + offs - 20*math.log10(abs(ref[x])))
+                 for x in range(half) if abs(ref[x]) > peak*threshold]
+        res = compare(mags, [abs(r) for r in ref], False)
+        return max(dberr), math.sqrt(sum(e*e for e in dberr)/len(dberr)), res[2], phase
+    res = compare([g[0] for g in got], [abs(r) for r in ref], False)
+    return res[0], res[1], res[2], phase
+
+# margin: dB by which the SNR limit is reduced.
+def passed(conversion, res, limits=LIMITS, margin=0):
+    minsnr, maxph = limits[conversion]
+    return res[2] >= minsnr - margin and (maxph is None or res[3] <= maxph)
+
+# Run all cases, printing results. Returns True if all cases pass. With
+# cls=QDFT the fixed point backend is tested against its own limits, by default
+# at lengths up to 4096.
+def test(lengths=None, conversions=None, windows=(None, hann), cls=DFT, **kwargs):
+    fixed = cls is QDFT
+    limits = QLIMITS if fixed else LIMITS
+    if lengths is None:
+        lengths = (16, 64, 256, 1024, 2048, 4096) if fixed else (16, 64, 256, 1024)
+    if conversions is None:
+        conversions = QCONVERSIONS if fixed else (FORWARD, REVERSE, HREVERSE, POLAR, DB,
+                                                  CEPSTRUM, AUTOCORR)
+    print('Conversion  Length Window   Max err  RMS err  SNR (dB) Phase (degs)')
+    fstr = '{:10s}{:8d} {:6s}{:9.2e}{:9.2e}{:9.1f}  {:8s}  {}'
+    ok = True
+    for conversion in conversions:
+        for length in lengths:
+            for winfunc in windows:
+                if conversion in (REVERSE, HREVERSE) and winfunc is not None:
+                    continue  # Window is not applied to reverse transforms
+                res = measure(conversion, length, winfunc, cls, **kwargs)
+                margin = 0
+                if fixed:
+                    margin = QSLOPE*round(math.log(length/QLENGTH)/math.log(2))
+                good = passed(conversion, res, limits, margin)
+                ok = ok and good
+                ph = '-' if res[3] is None else '{:8.4f}'.format(res[3])
+                wname = 'none' if winfunc is None else 'hann'
+                print(fstr.format(NAMES[conversion], length, wname, res[0], res[1],
+                                  res[2], ph, 'PASS' if good else 'FAIL'))
+    print('All tests passed.' if ok else 'Some tests FAILED.')
+    return ok
+
+# Compare the precision tiers of polar conversion
+def tiers(length=256):
+    print('Precision     Max mag err   SNR (dB) Phase (degs)')
+    fstr = '{:14s}{:9.2e}{:11.1f}{:11.4f}'
+    for name, tier in (('FAST', FAST), ('STANDARD', STANDARD), ('PRECISE', PRECISE),
+                       ('FAST|NOSQRT', FAST | NOSQRT), ('PRECISE|NOSQRT', PRECISE | NOSQRT)):
+        res = measure(POLAR, length, hann, precision=tier)
+        print(fstr.format(name, res[0], res[2], res[3]))
+
+# Check the response of the half-band filter in decimate.py. edge is the band of
+# interest as a fraction of the output sample rate. Components in it must be
+# flat to within ripple dB and those which would alias into it attenuated by at
+# least atten dB. Returns True if they are.
+def decimation(k=8, edge=0.34, ripple=0.05, atten=60, points=1000):
+    from decimate import design  # Imported here: the module contains assembler
+    c = design(k)
+    def gain(f):  # f is a fraction of the input sample rate
+        return abs(c[0] + 2*sum(c[m]*math.cos(2*math.pi*(2*m - 1)*f) for m in range(1, k + 1)))
+    f = edge/2
+    pb = [gain(f*i/points) for i in range(points + 1)]
+    sb = max(gain(0.5 - f*i/points) for i in range(points + 1))
+    dev = 20*math.log10(max(max(pb), 1/min(pb)))
+    att = -20*math.log10(sb)
+    good = dev <= ripple and att >= atten
+    print('Half-band k={}: to {:.3f} of output rate ripple {:.3f}dB attenuation {:.1f}dB  {}'.format(
+          k, edge, dev, att, 'PASS' if good else 'FAIL'))
+    return good
@@ -0,0 +1,148 @@
+#! /usr/bin/env python3
+# dftbatch.py Batch analysis of captured ADC frames on a host
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Capture files are binary: consecutive frames of length samples, as held in
+# DFTADC.buff (by default little-endian 32 bit integers). Files are memory
+# mapped: frames are divided into chunks which are transformed by a pool of
+# worker processes using dfthost.py. Results are written in frame order as they
+# become available. The number of chunks in progress is bounded so memory use
+# is independent of file size.
+# Usage example:
+# ./dftbatch.py -l 1024 -c DB -w hann unit*.bin
+# ./dftbatch.py --help for all options.
+
+import argparse
+import importlib
+import os
+import sys
+from collections import deque
+from multiprocessing import Pool, cpu_count
+import numpy as np
+import dfthost
+from dfthost import FORWARD, POLAR, DB, UNWRAP, GROUPDELAY, PYBOARD_DBOFFSET
+
+CONVERSIONS = {'FORWARD': FORWARD, 'POLAR': POLAR, 'DB': DB, 'UNWRAP': UNWRAP,
+               'GROUPDELAY': GROUPDELAY}
+
+# Settings for the process: initialised in each worker by setup()
+_settings = {}
+_maps = {}  # Memory mapped files open in this process
+
+def setup(settings):
+    _settings.update(settings)
+    length = settings['length']
+    winfunc = settings['winfunc']
+    _settings['window'] = None if winfunc is None else dfthost.windata(winfunc, length)
+
+def frames(fname):
+    if fname not in _maps:
+        s = _settings
+        dtype = np.dtype(s['dtype'])
+        nframes = (os.path.getsize(fname) - s['offset'])//(dtype.itemsize*s['length'])
+        _maps[fname] = np.memmap(fname, dtype=dtype, mode='r', offset=s['offset'],
+                                 shape=(nframes, s['length'])) if nframes else None
+    return _maps[fname]
+
+# Process frames start..start+count-1 of a file. Returns a 2D float32 array
+# holding a row of output per frame.
+def work(fname, start, count):
+    s = _settings
+    half = s['length']//2
+    re, im = dfthost.spectra(frames(fname)[start:start + count], s['conversion'],
+                             s['window'], s['scale'], s['dboffset'], s['phasethresh'])
+    if s['fields'] == 're':
+        return re[:, :half].astype(np.float32)
+    return np.hstack((re[:, :half], im[:, :half])).astype(np.float32)
+
+def write(fout, fmt, data, first):
+    if fmt == 'csv':
+        idx = np.arange(first, first + data.shape[0]).reshape(-1, 1)
+        np.savetxt(fout, np.hstack((idx, data)), fmt=['%d'] + ['%.6g']*data.shape[1],
+                   delimiter=',')
+    else:
+        fout.write(data.astype('<f4').tobytes())
+
+# Process one capture file. Returns the number of frames processed.
+def process(pool, fname, outname, args):
+    nframes = (os.path.getsize(fname) - args.offset)//(np.dtype(args.dtype).itemsize*args.length)
+    if nframes == 0:
+        print('{}: no complete frames.'.format(fname), file=sys.stderr)
+        return 0
+    pending = deque()
+    with open(outname, 'w' if args.format == 'csv' else 'wb') as fout:
+        for start in range(0, nframes, args.chunk):
+            pending.append((start, pool.apply_async(work, (fname, start, args.chunk))))
+            if len(pending) >= 2*args.processes:  # Bound memory in use
+                first, res = pending.popleft()
+                write(fout, args.format, res.get(), first)
+        while pending:
+            first, res = pending.popleft()
+            write(fout, args.format, res.get(), first)
+    return nframes
+
+def getwindow(name):
+    if name is None or name == 'none':
+        return None
+    if name in dfthost.WINDOWS:
+        return dfthost.WINDOWS[name]
+    module, _, func = name.partition(':')  # User function as module:function
+    return getattr(importlib.import_module(module), func)
+
+def getconversion(name):
+    conversion = 0
+    for n in name.upper().split('|'):
+        conversion |= CONVERSIONS[n]
+    return conversion
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch DFT analysis of ADC capture files.')
+    parser.add_argument('files', nargs='+', help='Capture files.')
+    parser.add_argument('-l', '--length', type=int, default=1024,
+                        help='Transform length: samples per frame (default 1024).')
+    parser.add_argument('-c', '--conversion', default='DB',
+                        help='Conversion type e.g. POLAR or DB|UNWRAP (default DB).')
+    parser.add_argument('-w', '--window', default=None,
+                        help='hann, hamming, blackman or module:function (default none).')
+    parser.add_argument('-t', '--dtype', default='<i4',
+                        help='NumPy dtype of samples (default <i4 as DFTADC.buff).')
+    parser.add_argument('--offset', type=int, default=0, help='Bytes to skip at start of file.')
+    parser.add_argument('--scale', type=float, default=None, help='Scaling (default 1/length).')
+    parser.add_argument('--dboffset', type=float, default=PYBOARD_DBOFFSET,
+                        help='dB offset (default {} as DFTADC).'.format(PYBOARD_DBOFFSET))
+    parser.add_argument('--phasethresh', type=float, default=0.0,
+                        help='Magnitude threshold for phase unwrapping (default 0).')
+    parser.add_argument('-f', '--format', choices=('bin', 'csv'), default='bin',
+                        help='Output format (default bin: little-endian float32).')
+    parser.add_argument('--fields', choices=('both', 're'), default='both',
+                        help='Output re and im or re only (default both).')
+    parser.add_argument('-o', '--outdir', default=None,
+                        help='Output directory (default that of each input file).')
+    parser.add_argument('-p', '--processes', type=int, default=cpu_count(),
+                        help='Worker processes (default all cores).')
+    parser.add_argument('--chunk', type=int, default=256, help='Frames per work unit (default 256).')
+    args = parser.parse_args(argv)
+    bits = round(np.log2(args.length))
+    if 2**bits != args.length:
+        parser.error('Length must be an integer power of two')
+    try:
+        conversion = getconversion(args.conversion)
+    except KeyError:
+        parser.error('Invalid conversion type {}'.format(args.conversion))
+    if conversion & FORWARD == 0:
+        parser.error('Only forward conversions are supported')
+    settings = {'length': args.length, 'dtype': args.dtype, 'offset': args.offset,
+                'conversion': conversion, 'winfunc': getwindow(args.window),
+                'scale': args.scale, 'dboffset': args.dboffset,
+                'phasethresh': args.phasethresh, 'fields': args.fields}
+    with Pool(args.processes, setup, (settings,)) as pool:
+        for fname in args.files:
+            outdir = os.path.dirname(fname) if args.outdir is None else args.outdir
+            ext = '.csv' if args.format == 'csv' else '.spec'
+            outname = os.path.join(outdir, os.path.basename(fname) + ext)
+            n = process(pool, fname, outname, args)
+            print('{}: {} frames written to {}'.format(fname, n, outname))
+
+if __name__ == '__main__':
+    main()
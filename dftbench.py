@@ -3,18 +3,93 @@
 # 5th October 2019
 # Released under the MIT license.
 
-from dftclass import DFTADC, FORWARD
+import array
+import gc
+import utime
 
 print('''
 This acquires data from ADC on pin X7 and performs a 1024 point forward tarnsform.
 The time from completion of data acquisition to completion of the transform is
 measured and printed. The voltage on the ADC input is immaterial as we discard the
 results of the transform.
+Import, construction and first run are also measured. For each, the peak heap is
+the no. of bytes allocated with the garbage collector disabled and the retained
+heap is that still allocated after a collection. On platforms without a Pyboard
+ADC a DFT instance is used with synthetic data.
+The in place transform is compared with the Stockham autosort variant. Finally
+the portable kernels are compared: pure Python (dftpy.py) and native code
+(dftport.py).
 
 ''')
 
-mydft = DFTADC(1024, 'X7')  # Use default timer 6
+# Run func. Returns its result, the time taken (μs), peak and retained heap.
+def measure(func):
+    gc.collect()
+    base = gc.mem_alloc()
+    gc.disable()
+    t = utime.ticks_us()
+    res = func()
+    dt = utime.ticks_diff(utime.ticks_us(), t)
+    peak = gc.mem_alloc() - base
+    gc.enable()
+    gc.collect()
+    return res, dt, peak, gc.mem_alloc() - base
 
-dt = mydft.run(FORWARD, 0.1)
+def do_import():
+    import dftclass
+    return dftclass
+
+def construct():
+    if dftclass.pyb is None:
+        return dftclass.DFT(1024, lambda d: None)
+    return dftclass.DFTADC(1024, 'X7')  # Use default timer 6
+
+def run():
+    if isinstance(mydft, dftclass.DFTADC):
+        return mydft.run(dftclass.FORWARD, 0.1)
+    return mydft.run(dftclass.FORWARD)
+
+fstr = '{:20s}{:10d}{:10d}{:10d}'
+print('{:20s}{:>10s}{:>10s}{:>10s}'.format('Phase', 'Time μs', 'Peak', 'Retained'))
+dftclass, dt, peak, kept = measure(do_import)
+print(fstr.format('Import', dt, peak, kept))
+mydft, dt, peak, kept = measure(construct)
+print(fstr.format('Construct', dt, peak, kept))
+_, dt, peak, kept = measure(run)
+print(fstr.format('First run', dt, peak, kept))
+_, dt, peak, kept = measure(run)
+print(fstr.format('Second run', dt, peak, kept))
+print('Backend:', dftclass.BACKEND)
+
+dt = run()
 print('Time for 1024 point forward transform: {}μs.'.format(dt))
 
+# Compare the in place and Stockham transforms. run() returns the time taken by
+# the raw conversion, excluding window and populate function.
+def populate(dft):
+    for x in range(dft.length):
+        dft.re[x] = x % 7
+
+scratch = array.array('f', (0 for _ in range(2048)))
+for length in (256, 1024):
+    for buf, name in ((None, 'In place'), (scratch, 'Stockham')):
+        d = dftclass.DFT(length, populate, scratch=buf)
+        d.prepare(dftclass.FORWARD)
+        dt = min(d.run(dftclass.FORWARD) for _ in range(3))
+        print('{:4d} point {:8s} forward transform: {}μs.'.format(length, name, dt))
+
+# Compare the portable kernels by calling their fft() directly with the control
+# array of a DFT instance. Either may be unavailable on a given platform.
+d = dftclass.DFT(256, populate)
+d.prepare(dftclass.FORWARD)
+for name in ('dftpy', 'dftport'):
+    try:
+        mod = __import__(name)
+    except (ImportError, SyntaxError):
+        print('{:8s} not available.'.format(name))
+        continue
+    populate(d)
+    t = utime.ticks_us()
+    mod.fft(d.ctrl, dftclass.FORWARD)
+    dt = utime.ticks_diff(utime.ticks_us(), t)
+    print(' 256 point {:8s} forward transform: {}μs.'.format(name, dt))
@@ -14,12 +14,21 @@
 PYBOARD_DBOFFSET = const(59)
 import array
 import math
-import pyb
-from dft import fft
 from uctypes import addressof
-from window import winapply, setarray, icopy
-from polar import topolar
 import utime
+try:
+    import pyb                  # Required by DFTADC only
+except ImportError:
+    pyb = None
+
+# Kernels are imported on first use because importing an assembler module
+# compiles every function in it. The assembler requires an ARM CPU with an FPU.
+# Elsewhere Viper and native code versions are used if the native code emitter
+# is available, otherwise pure Python versions. BACKEND records the choice.
+# Polar kernels are imported only when a conversion requires them.
+BACKEND = None          # 'asm', 'viper' or 'python' once loaded
+fft = stockham = hermitian = interleave = winapply = setarray = icopy = scopy = None
+topolar = unwrap = powerspec = logmag = None
 
 # Control: on entry r1 should hold one of these values to determine the direction and scaling
 # of the transform. Only bit 0 now used by fft()
@@ -27,6 +36,42 @@ REVERSE = const(0)      # Inverse transform (frequency to time domain)
 FORWARD = const(1)      # Forward transform
 POLAR   = const(3)      # bit 2: Polar conversion
 DB      = const(7)      # bit 3: Polar with dB conversion
+UNWRAP  = const(11)     # bit 4: Polar with unwrapped phase. May be ORed with DB
+GROUPDELAY = const(27)  # bit 5: Polar with group delay in place of phase. May be ORed with DB
+HREVERSE = const(32)    # bit 6: Inverse transform of bins 0..N/2 to a real signal
+CEPSTRUM = const(65)    # bit 7: Real cepstrum: reverse transform of log magnitude
+AUTOCORR = const(129)   # bit 8: Autocorrelation: reverse transform of power spectrum
+
+# Polar conversion precision tiers: see polar.py
+FAST = const(0)
+STANDARD = const(1)
+PRECISE = const(2)
+NOSQRT = const(4)
+
+# Import the kernels required by a conversion (all kernels if None).
+def _load(conversion=None):
+    global BACKEND, fft, stockham, hermitian, interleave, winapply, setarray, icopy, scopy
+    global topolar, unwrap, powerspec, logmag
+    if BACKEND is None:
+        try:
+            from dft import fft, stockham, hermitian, interleave
+            from window import winapply, setarray, icopy, scopy
+            BACKEND = 'asm'
+        except (ImportError, SyntaxError):
+            try:
+                from dftport import fft, stockham, hermitian, interleave, winapply, setarray, icopy, scopy
+                BACKEND = 'viper'
+            except (ImportError, SyntaxError):
+                from dftpy import fft, stockham, hermitian, interleave, winapply, setarray, icopy, scopy
+                BACKEND = 'python'
+    if topolar is None and (conversion is None or (conversion & POLAR) == POLAR
+                            or conversion in (CEPSTRUM, AUTOCORR)):
+        if BACKEND == 'asm':
+            from polar import topolar, unwrap, powerspec, logmag
+        elif BACKEND == 'viper':
+            from dftport import topolar, unwrap, powerspec, logmag
+        else:
+            from dftpy import topolar, unwrap, powerspec, logmag
 
 # Instantiating the class creates the real, imaginary and control arrays, populates real and imaginary
 # with zero. Populates the control array with these values:
@@ -36,53 +81,155 @@ DB      = const(7)      # bit 3: Polar with dB conversion
 # ctrl[3] = Address of imaginary data array
 # ctrl[4] = Byte Offset into entry 0 of complex roots of unity
 # ctrl[5] = Address of scratchpad for use by fft code
+# ctrl[6] = Address of scratch real array (stockham() only)
+# ctrl[7] = Address of scratch imaginary array (stockham() only)
 # After this is an array of seven complex nos followed by one for the roots of unity.
 # The first complex no. is initialised to the initial u value. The rest make up a scratchpad used by fft()
 # see ctrlmap.ods for more detail.
 
+# Create the control and complex arrays for a transform of a given length
+# operating on arrays re and im.
+def _mkctrl(length, re, im):
+    COMPLEX_NOS = 7                 # Size of complex buffer area before roots of unity
+    ROOTSOFFSET = COMPLEX_NOS*2     # Word offset into complex array of roots of unity
+    bits = round(math.log(length)/math.log(2))
+    ctrl = array.array('i', [0]*8)
+    cmplx = array.array('f', [0.0]*((bits +1 +COMPLEX_NOS)*2))
+    ctrl[0] = length
+    ctrl[1] = bits
+    ctrl[2] = addressof(re)
+    ctrl[3] = addressof(im)
+    ctrl[4] = COMPLEX_NOS*8         # Byte offset into complex array of roots of unity
+    ctrl[5] = addressof(cmplx)      # Base address
+
+    cmplx[0] = 1.0                  # Initial value of u = [1 +j0]
+    cmplx[1] = 0.0                  # Intermediate values are used by fft() and not initialised
+    cmplx[12] = 1.0/length          # Default scaling multiply by 1/length
+    cmplx[13] = 0.0                 # ignored
+    i = ROOTSOFFSET
+    creal = -1
+    cimag =  0
+    cmplx[i] = creal                # Complex roots of unity
+    cmplx[i +1] = cimag
+    i += 2
+    for x in range(bits):
+        cimag = math.sqrt((1.0 - creal) / 2.0)  # Imaginary part
+        cmplx[i +1] = cimag
+        creal = math.sqrt((1.0 + creal) / 2.0)  # Real part
+        cmplx[i] = creal
+        i += 2
+    return ctrl, cmplx
+
+# Check that a buffer supplied by the application can hold length floats.
+def _chkbuf(buf, length):
+    if len(buf) < length:
+        raise ValueError('Buffer must hold at least {} elements'.format(length))
+    return buf
+
+# re and im may be existing float arrays or memoryviews into them (e.g. a frame
+# in a larger buffer). These are used for the data in place of arrays allocated
+# by the constructor. If a scratch buffer of 2*length floats is supplied the
+# Stockham autosort transform is used: see the scratch property.
 class DFT(object):
-    def __init__(self, length, popfunc=None, winfunc=None):
+    def __init__(self, length, popfunc=None, winfunc=None, re=None, im=None, scratch=None):
         bits = round(math.log(length)/math.log(2))
         assert 2**bits == length, "Length must be an integer power of two"
         self.dboffset = 0               # Offset for dB calculation
+        self.precision = STANDARD       # Polar conversion precision tier
+        self.phasethresh = 0.0          # Magnitude threshold for phase unwrapping
         self._length = length
         self.popfunc = popfunc          # Function to acquire data
-        self.re = array.array('f', (0 for x in range(self._length)))
-        self.im = array.array('f', (0 for x in range(self._length)))
-        if winfunc is not None:  # If a window function is provided, create and populate the array
-            self.windata = array.array('f', (0 for x in range(self._length))) # of window coefficients
-            for x in range(0, length):
-                self.windata[x] = winfunc(x, length)
+        if re is None:
+            self.re = array.array('f', (0 for x in range(self._length)))
         else:
-            self.windata = None
-        COMPLEX_NOS = 7                 # Size of complex buffer area before roots of unity
-        ROOTSOFFSET = COMPLEX_NOS*2     # Word offset into complex array of roots of unity
-        bits = round(math.log(self._length)/math.log(2))
-        self.ctrl = array.array('i', [0]*6)
-        self.cmplx = array.array('f', [0.0]*((bits +1 +COMPLEX_NOS)*2))
-        self.ctrl[0] = self._length
-        self.ctrl[1] = bits
-        self.ctrl[2] = addressof(self.re)
-        self.ctrl[3] = addressof(self.im)
-        self.ctrl[4] = COMPLEX_NOS*8    # Byte offset into complex array of roots of unity
-        self.ctrl[5] = addressof(self.cmplx) # Base address
-
-        self.cmplx[0] = 1.0             # Initial value of u = [1 +j0]
-        self.cmplx[1] = 0.0             # Intermediate values are used by fft() and not initialised
-        self.cmplx[12] = 1.0/self._length # Default scaling multiply by 1/length
-        self.cmplx[13] = 0.0            # ignored
-        i = ROOTSOFFSET
-        creal = -1
-        cimag =  0
-        self.cmplx[i] = creal           # Complex roots of unity
-        self.cmplx[i +1] = cimag
-        i += 2
-        for x in range(bits):
-            cimag = math.sqrt((1.0 - creal) / 2.0)  # Imaginary part
-            self.cmplx[i +1] = cimag
-            creal = math.sqrt((1.0 + creal) / 2.0)  # Real part
-            self.cmplx[i] = creal
-            i += 2
+            self.re = _chkbuf(re, length)
+        if im is None:
+            self.im = array.array('f', (0 for x in range(self._length)))
+        else:
+            self.im = _chkbuf(im, length)
+        self._winfunc = winfunc
+        self._windata = None            # Window coefficients: created on first use
+        self.ctrl, self.cmplx = _mkctrl(self._length, self.re, self.im)
+        self.hctrl = None               # Created on first HREVERSE conversion
+        self.scratch = scratch          # Scratch buffer for stockham()
+
+    @property
+    def windata(self):
+        if self._windata is None and self._winfunc is not None:
+            length = self._length
+            self._windata = array.array('f', (self._winfunc(x, length) for x in range(length)))
+        return self._windata
+
+    # Load kernels and create deferred arrays so that a latency critical first
+    # run() is not delayed. Prepares for the given conversion or, by default,
+    # for any conversion.
+    def prepare(self, conversion=None):
+        _load(conversion)
+        self.windata
+        if conversion is None or conversion in (HREVERSE, CEPSTRUM, AUTOCORR):
+            self._hsetup()
+
+    # Transform data in other buffers: float arrays or memoryviews holding at
+    # least length elements. A value of None retains the current buffer. The
+    # control arrays are updated so that no data is copied. re and im must not
+    # overlap. Buffers may be shared by instances which are not run concurrently.
+    def attach(self, re=None, im=None):
+        if re is not None:
+            self.re = _chkbuf(re, self._length)
+        if im is not None:
+            self.im = _chkbuf(im, self._length)
+        ra = addressof(self.re)
+        ia = addressof(self.im)
+        self.ctrl[2] = ra
+        self.ctrl[3] = ia
+        if self.hctrl is not None:
+            self.hctrl[2] = ra
+            self.hctrl[3] = ia
+            self.hpre[1] = ra
+            self.hpre[2] = ia
+
+    # Scratch buffer for the Stockham autosort transform: a float array or
+    # memoryview of at least 2*length elements, used as real then imaginary
+    # arrays. It may be shared by instances which are not run concurrently.
+    # None selects the in place transform.
+    @property
+    def scratch(self):
+        return self._scratch
+
+    @scratch.setter
+    def scratch(self, buf):
+        self._scratch = None if buf is None else _chkbuf(buf, 2*self._length)
+        self._setscratch(self.ctrl, self._length)
+        if self.hctrl is not None:
+            self._setscratch(self.hctrl, self._length//2)
+
+    def _setscratch(self, ctrl, length):
+        if self._scratch is None:
+            ctrl[6] = 0
+            ctrl[7] = 0
+        else:
+            ctrl[6] = addressof(self._scratch)
+            ctrl[7] = ctrl[6] + 4*length
+
+    # Real inverse transform. Uses a half length fft() with its own control
+    # arrays, hermitian() control array and rotation constant.
+    def _hsetup(self):
+        half = self._length//2
+        if self.hctrl is None:
+            self.hctrl, self.hcmplx = _mkctrl(half, self.re, self.im)
+            self._setscratch(self.hctrl, half)
+            self.hrot = array.array('f', [math.cos(2*math.pi/self._length),
+                                          math.sin(2*math.pi/self._length)])
+            self.hpre = array.array('i', [half, addressof(self.re), addressof(self.im),
+                                          addressof(self.hrot)])
+
+    def _hreverse(self):
+        half = self._length//2
+        self._hsetup()
+        hermitian(self.hpre)
+        (fft if self._scratch is None else stockham)(self.hctrl, REVERSE)
+        interleave(self.re, self.im, half)
+        setarray(self.im, 0, self._length)
 
     @property
     def scale(self):
@@ -96,28 +243,167 @@ class DFT(object):
     def length(self):
         return self._length  # Read only
 
-    def run(self, conversion):          # Uses assembler for speed
+    def run(self, conversion, re=None, im=None):  # Uses assembler for speed
+        _load(conversion)
+        if re is not None or im is not None:
+            self.attach(re, im)         # Buffers remain attached after the call
         if self.popfunc is not None:
             self.popfunc(self)          # Populate the data (for fwd transfers, just the real data)
-        if conversion != REVERSE:       # Forward transform: real data assumed
+        if conversion & FORWARD:        # Forward transform: real data assumed
             setarray(self.im, 0, self._length)# Fast zero imaginary data
-            if self.windata is not None:  # Fast apply the window function
-                winapply(self.re, self.windata, self._length)
+            windata = self.windata
+            if windata is not None:  # Fast apply the window function
+                winapply(self.re, windata, self._length)
         start = utime.ticks_us()
-        fft(self.ctrl, conversion)
+        if conversion == HREVERSE:
+            self._hreverse()
+        else:
+            (fft if self._scratch is None else stockham)(self.ctrl, conversion)
+            if conversion in (CEPSTRUM, AUTOCORR): # Spectrum is real and even
+                half = self._length//2 + 1
+                if conversion == AUTOCORR:
+                    powerspec(self.re, self.im, half)
+                else:
+                    logmag(self.re, self.im, half, 1/self._length)
+                self._hreverse()
         delta = utime.ticks_diff(utime.ticks_us(), start)
+        self.convert(conversion)
+        return delta
+
+    def convert(self, conversion):      # Apply any polar conversion to results
         if (conversion & POLAR) == POLAR: # Ignore complex conjugates, convert 1st half of arrays
-            topolar(self.re, self.im, self._length//2) # Fast
-            if conversion == DB:        # Ignore conjugates: convert 1st half only
+            _load(conversion)
+            topolar(self.re, self.im, self._length//2, self.precision) # Fast
+            if (conversion & UNWRAP) == UNWRAP: # Needs linear magnitudes
+                unwrap(self.re, self.im, self._length//2, self.phasethresh,
+                       (conversion & GROUPDELAY) == GROUPDELAY)
+            if (conversion & DB) == DB: # Ignore conjugates: convert 1st half only
                 for idx, val in enumerate(self.re[0:self._length//2]):
                     self.re[idx] = -80.0 if val <= 0.0 else 20*math.log10(val) - self.dboffset
+
+# Two dimensional transform. Data is held by rows in the re and im arrays:
+# element [row, col] is at index row*cols + col. Row and column passes use the
+# 1D fft() with one set of control arrays per dimension length (one set only if
+# the array is square). Rows are transformed in place by pointing the control
+# array at each row in turn. Each column is gathered into scratch arrays,
+# transformed and scattered back.
+
+class DFT2D(object):
+    def __init__(self, rows, cols, popfunc=None, winfunc=None):
+        for n in (rows, cols):
+            bits = round(math.log(n)/math.log(2))
+            assert 2**bits == n, "Dimensions must be integer powers of two"
+        self.dboffset = 0               # Offset for dB calculation
+        self.precision = STANDARD       # Polar conversion precision tier
+        self._rows = rows
+        self._cols = cols
+        self.popfunc = popfunc          # Function to acquire data
+        size = rows*cols
+        self.re = array.array('f', (0 for x in range(size)))
+        self.im = array.array('f', (0 for x in range(size)))
+        self.colre = array.array('f', (0 for x in range(rows))) # Column scratch
+        self.colim = array.array('f', (0 for x in range(rows)))
+        self._winfunc = winfunc
+        self._windata = None            # Window coefficients: created on first use
+        self.ctrl, self.cmplx = _mkctrl(cols, self.re, self.im) # Row transforms
+        if rows == cols:
+            self.colctrl = self.ctrl    # Shared: addresses are set before each pass
+        else:
+            self.colctrl, self.colcmplx = _mkctrl(rows, self.colre, self.colim)
+        rowbytes = cols*4
+        self._gather = array.array('i', [rows, 0, 0, rowbytes, addressof(self.colre),
+                                         addressof(self.colim), 4])
+        self._scatter = array.array('i', [rows, addressof(self.colre), addressof(self.colim),
+                                          4, 0, 0, rowbytes])
+
+    @property
+    def rows(self):
+        return self._rows  # Read only
+
+    @property
+    def cols(self):
+        return self._cols
+
+    @property
+    def windata(self):  # Separable window: coefficient is w(row)*w(col)
+        winfunc = self._winfunc
+        if self._windata is None and winfunc is not None:
+            rows = self._rows
+            cols = self._cols
+            self._windata = array.array('f', (winfunc(r, rows)*winfunc(c, cols)
+                                              for r in range(rows) for c in range(cols)))
+        return self._windata
+
+    def prepare(self, conversion=None):  # As per DFT.prepare()
+        _load(conversion)
+        self.windata
+
+    def run(self, conversion):
+        if conversion not in (FORWARD, REVERSE, POLAR, DB):
+            raise ValueError('Unsupported conversion')
+        _load(conversion)
+        size = self._rows*self._cols
+        if self.popfunc is not None:
+            self.popfunc(self)
+        if conversion & FORWARD:        # Real data assumed
+            setarray(self.im, 0, size)
+            windata = self.windata
+            if windata is not None:
+                winapply(self.re, windata, size)
+        start = utime.ticks_us()
+        ctrl = self.ctrl
+        rowbytes = self._cols*4
+        re = addressof(self.re)
+        im = addressof(self.im)
+        for _ in range(self._rows):     # Row pass
+            ctrl[2] = re
+            ctrl[3] = im
+            fft(ctrl, conversion)
+            re += rowbytes
+            im += rowbytes
+        ctrl = self.colctrl
+        ctrl[2] = addressof(self.colre)
+        ctrl[3] = addressof(self.colim)
+        gather = self._gather
+        scatter = self._scatter
+        re = addressof(self.re)
+        im = addressof(self.im)
+        for _ in range(self._cols):     # Column pass
+            gather[1] = re
+            gather[2] = im
+            scatter[4] = re
+            scatter[5] = im
+            scopy(gather)
+            fft(ctrl, conversion)
+            scopy(scatter)
+            re += 4
+            im += 4
+        delta = utime.ticks_diff(utime.ticks_us(), start)
+        self.convert(conversion)
         return delta
+
+    def convert(self, conversion):      # Polar conversion of the entire arrays
+        if (conversion & POLAR) == POLAR:
+            _load(conversion)
+            size = self._rows*self._cols
+            topolar(self.re, self.im, size, self.precision)
+            if (conversion & DB) == DB:
+                for idx, val in enumerate(self.re):
+                    self.re[idx] = -80.0 if val <= 0.0 else 20*math.log10(val) - self.dboffset
+
 # Subclass for acquiring data from Pyboard ADC using read_timed() method.
 
 class DFTADC(DFT):
-    def __init__(self, length, adcpin, winfunc=None, timer=6):
+    def __init__(self, length, adcpin, winfunc=None, timer=6, decimate=1):
         super().__init__(length, winfunc = winfunc)
-        self.buff = array.array('i', (0 for x in range(self._length)))
+        if decimate > 1:  # Oversample: capture buffer is also the filter workspace
+            from decimate import Decimator
+            self.decimator = Decimator(length, decimate)
+            nsamples = self.decimator.capture
+        else:
+            self.decimator = None
+            nsamples = self._length
+        self.buff = array.array('i', (0 for x in range(nsamples)))
         if isinstance(adcpin, pyb.ADC):
             self.adc = adcpin
         else:
@@ -128,12 +414,21 @@ class DFTADC(DFT):
             self.timer = pyb.Timer(timer)
         self.dboffset = PYBOARD_DBOFFSET # Value for Pyboard ADC
 
-    def run(self, conversion, duration):
+    def run(self, conversion, duration, re=None, im=None):
+        _load(conversion)
+        if re is not None or im is not None:
+            self.attach(re, im)
         tim = self.timer
         tim.deinit()
-        tim.init(freq = int(self._length/duration))
+        dec = self.decimator
+        factor = 1 if dec is None else dec.factor
+        tim.init(freq = int(self._length*factor/duration))
         self.adc.read_timed(self.buff, tim) # Note: blocks for duration
         start = utime.ticks_us()
-        icopy(self.buff, self.re, self._length) # Fast copy integer array into real
+        if dec is None:
+            icopy(self.buff, self.re, self._length) # Fast copy integer array into real
+        else:
+            icopy(self.buff, self.buff, len(self.buff)) # Convert to float in place
+            dec.run(self.buff, self.re)
         super().run(conversion)
         return utime.ticks_diff(utime.ticks_us(), start)
@@ -0,0 +1,444 @@
+# dftfixed.py Q15 fixed point FFT for platforms without an FPU
+# 19th Oct 2026
+# Released under the MIT license.
+
+# The DFT class has the interface of dftclass.DFT: data is supplied and results
+# are returned in the float arrays re and im. The transform is performed on 16
+# bit integer (Q15) copies qre and qim using block floating point: a single
+# exponent applies to the whole block. Before each radix-2 stage the largest
+# value is checked and the stage outputs are shifted right by 0, 1 or 2 bits so
+# that they cannot overflow. The shift is added to the block exponent.
+# Conversion between floats and the integer block is performed by manipulating
+# IEEE 754 bit patterns with integer instructions and polar conversion uses
+# CORDIC, so the kernels perform no floating point arithmetic. They are written
+# in Viper and run on any MicroPython target such as the RP2040 (Cortex-M0+).
+# Supported conversions are FORWARD, REVERSE, POLAR and DB.
+
+import array
+import math
+import utime
+from uctypes import addressof
+
+# Conversion types: values and meanings as per dftclass.py
+REVERSE = const(0)      # Inverse transform (frequency to time domain)
+FORWARD = const(1)      # Forward transform
+POLAR   = const(3)      # bit 2: Polar conversion
+DB      = const(7)      # bit 3: Polar with dB conversion
+HREVERSE = const(32)    # The following are not supported by this module
+CEPSTRUM = const(65)
+AUTOCORR = const(129)
+
+# Polar precision tiers (ignored: CORDIC has a fixed precision)
+FAST = const(0)
+STANDARD = const(1)
+PRECISE = const(2)
+NOSQRT = const(4)
+
+ITERATIONS = const(24)  # CORDIC iterations. Angles are in units of 2**-28 radians.
+_atans = array.array('i', [round(math.atan(2**-i)*2**28) for i in range(ITERATIONS)]
+                     + [round(math.pi*2**28)])
+GAIN = 1.6467602581     # CORDIC gain: product of sqrt(1 + 2**(-2*i))
+
+# Largest exponent field of n floats.
+@micropython.viper
+def maxexp(src, n: int) -> int:
+    s = ptr32(src)
+    m = 0
+    i = 0
+    while i < n:
+        e = (s[i] >> 23) & 0xff
+        if e > m:
+            m = e
+        i += 1
+    return m
+
+# Convert n floats to Q15: dst = src*2**(141 - emax) where emax is the largest
+# exponent field. Hence the largest value is in the range 16384 to 32767.
+# Denormals are treated as zero.
+@micropython.viper
+def tofixed(src, dst, n: int, emax: int):
+    s = ptr32(src)
+    d = ptr16(dst)
+    i = 0
+    while i < n:
+        b = s[i]
+        e = (b >> 23) & 0xff
+        sh = emax - e + 9
+        v = 0
+        if e > 0 and sh < 25:
+            v = (((b & 0x7fffff) | 0x800000) + (1 << (sh - 1))) >> sh
+            if v > 32767:
+                v = 32767
+            if b < 0:
+                v = -v
+        d[i] = v
+        i += 1
+
+# Convert n integers to floats: dst = src*ctrl[0]*2**ctrl[1]
+# src may be a Q15 ('h') array or, if ctrl[2] is nonzero, 32 bit integers. In
+# the latter case src and dst may be the same array. ctrl[0] is in the range
+# 16384 to 32767.
+@micropython.viper
+def tofloat(src, dst, n: int, ctrl):
+    s16 = ptr16(src)
+    s32 = ptr32(src)
+    d = ptr32(dst)
+    c = ptr32(ctrl)
+    mq = c[0]
+    e = c[1] + 150          # Exponent field of a value normalised to 24 bits
+    wide = c[2]
+    i = 0
+    while i < n:
+        if wide:
+            v = s32[i]
+        else:
+            v = (s16[i] << 16) >> 16
+        a = v
+        if v < 0:
+            a = -v
+        f = e
+        if a < 65536:
+            a *= mq
+        else:               # Avoid overflow
+            a = (a >> 15)*mq + (((a & 32767)*mq) >> 15)
+            f += 15
+        b = 0
+        if a > 0:
+            while a >= 16777216:
+                a = (a + 1) >> 1
+                f += 1
+            while a < 8388608:
+                a <<= 1
+                f -= 1
+            if f > 0:       # Flush underflow to zero
+                b = (f << 23) | (a & 0x7fffff) | ((v >> 31) << 31)
+        d[i] = b
+        i += 1
+
+# Zero n Q15 values.
+@micropython.viper
+def qzero(dst, n: int):
+    d = ptr16(dst)
+    i = 0
+    while i < n:
+        d[i] = 0
+        i += 1
+
+# Sum of n Q15 values.
+@micropython.viper
+def qsum(src, n: int) -> int:
+    s = ptr16(src)
+    t = 0
+    i = 0
+    while i < n:
+        t += (s[i] << 16) >> 16
+        i += 1
+    return t
+
+# Subtract ctrl[0] from n Q15 values and multiply by a fixed point window. The product
+# is shifted right by ctrl[1] bits. Returns the bitwise OR of the magnitudes of
+# the results. If ctrl[1] < 0 the unshifted results are not stored.
+@micropython.viper
+def qwindow(data, win, n: int, ctrl) -> int:
+    d = ptr16(data)
+    w = ptr16(win)
+    c = ptr32(ctrl)
+    mean = c[0]
+    sh = c[1]
+    rnd = 0
+    if sh > 0:
+        rnd = 1 << (sh - 1)
+    acc = 0
+    i = 0
+    while i < n:
+        v = (((d[i] << 16) >> 16) - mean)*((w[i] << 16) >> 16)
+        if sh >= 0:
+            v = (v + rnd) >> sh
+            if v > 32767:
+                v = 32767
+            d[i] = v
+        acc |= v ^ (v >> 31)
+        i += 1
+    return acc
+
+# Radix-2 decimation in time FFT of Q15 data in place with block floating point
+# scaling. Returns the no. of bits by which the data has been shifted right.
+# tw: cos and -sin of 2*pi*k/n for k = 0 to n/2 - 1 (Q15)
+# ctrl[0] = n
+# ctrl[1] = 1 forward, -1 reverse transform
+# Stage outputs are bounded by (1 + sqrt(2)) times the largest input (2 times
+# in the first two stages). The shift of 0, 1 or 2 bits is the least which
+# ensures that they fit 16 bits given the largest magnitude: no headroom is
+# wasted by rounding the bound up to a power of 2. 32 bit intermediates cannot
+# overflow.
+@micropython.viper
+def fixfft(re, im, tw, ctrl) -> int:
+    xr = ptr16(re)
+    xi = ptr16(im)
+    w = ptr16(tw)
+    c = ptr32(ctrl)
+    n = c[0]
+    dirn = c[1]
+    mx = 0                  # Largest magnitude
+    i = 0
+    j = 0
+    while i < n:            # Bit reversed reordering
+        if i < j:
+            t = xr[i]
+            xr[i] = xr[j]
+            xr[j] = t
+            t = xi[i]
+            xi[i] = xi[j]
+            xi[j] = t
+        v = (xr[i] << 16) >> 16
+        v ^= v >> 31
+        if v > mx:
+            mx = v
+        v = (xi[i] << 16) >> 16
+        v ^= v >> 31
+        if v > mx:
+            mx = v
+        m = n >> 1
+        while m > 0 and (j & m) != 0:
+            j ^= m
+            m >>= 1
+        j |= m
+        i += 1
+    shift = 0
+    span = 1                # Butterfly span
+    step = n                # Twiddle index increment
+    while span < n:
+        sh = 0
+        if span <= 2:       # Twiddles are 1 and -j: growth is at most 2
+            if mx > 16383:
+                sh = 1
+        elif mx > 27145:    # 65535/(1 + sqrt(2))
+            sh = 2
+        elif mx > 13572:
+            sh = 1
+        rnd = (1 << sh) >> 1
+        shift += sh
+        mx = 0
+        start = 0
+        while start < n:
+            k = 0
+            a = start
+            end = start + span
+            while a < end:
+                b = a + span
+                br = (xr[b] << 16) >> 16
+                bi = (xi[b] << 16) >> 16
+                if k == 0:
+                    tr = br
+                    ti = bi
+                else:
+                    cs = (w[k] << 16) >> 16
+                    sn = ((w[k + 1] << 16) >> 16)*dirn
+                    tr = (br*cs - bi*sn + 16384) >> 15
+                    ti = (bi*cs + br*sn + 16384) >> 15
+                ar = (xr[a] << 16) >> 16
+                ai = (xi[a] << 16) >> 16
+                v = (ar + tr + rnd) >> sh
+                xr[a] = v
+                v ^= v >> 31
+                if v > mx:
+                    mx = v
+                v = (ai + ti + rnd) >> sh
+                xi[a] = v
+                v ^= v >> 31
+                if v > mx:
+                    mx = v
+                v = (ar - tr + rnd) >> sh
+                xr[b] = v
+                v ^= v >> 31
+                if v > mx:
+                    mx = v
+                v = (ai - ti + rnd) >> sh
+                xi[b] = v
+                v ^= v >> 31
+                if v > mx:
+                    mx = v
+                k += step
+                a += 1
+            start = end + span
+        span <<= 1
+        step >>= 1
+    return shift
+
+# CORDIC Cartesian to polar conversion of Q15 data. The results are 32 bit
+# integers: the magnitude times gain*2**14 and the phase in units of 2**-28
+# radians.
+# ctrl[0] = No. of values
+# ctrl[1] = No. of iterations
+# ctrl[2] = Address of magnitude destination
+# ctrl[3] = Address of phase destination
+# atans: arctangent table followed by pi
+@micropython.viper
+def qpolar(re, im, ctrl, atans):
+    xr = ptr16(re)
+    xi = ptr16(im)
+    c = ptr32(ctrl)
+    at = ptr32(atans)
+    n = c[0]
+    iters = c[1]
+    mag = ptr32(c[2])
+    phase = ptr32(c[3])
+    pi = at[iters]
+    i = 0
+    while i < n:
+        x = ((xr[i] << 16) >> 16) << 14
+        y = ((xi[i] << 16) >> 16) << 14
+        ang = 0
+        if x == 0 and y == 0:   # Zero phase as per polar.topolar()
+            mag[i] = 0
+            phase[i] = 0
+            i += 1
+            continue
+        if x < 0:           # Rotate into right half plane
+            x = -x
+            y = -y
+            ang = pi
+            if y > 0:
+                ang = -pi
+        k = 0
+        while k < iters:
+            dx = x >> k
+            dy = y >> k
+            if y > 0:
+                x += dy
+                y -= dx
+                ang += at[k]
+            else:
+                x -= dy
+                y += dx
+                ang -= at[k]
+            k += 1
+        mag[i] = x
+        phase[i] = ang
+        i += 1
+
+_cache = {}
+
+# Twiddle factors for a given length: cos and -sin (Q15). -sin is stored
+# because its range (-1 to 0) includes -1.
+def _twiddles(length):
+    if length not in _cache:
+        tw = array.array('h', (0 for _ in range(length)))
+        for k in range(length//2):
+            a = 2*math.pi*k/length
+            tw[2*k] = min(32767, round(32768*math.cos(a)))
+            tw[2*k + 1] = round(-32768*math.sin(a))
+        _cache[length] = tw
+    return _cache[length]
+
+class DFT(object):
+    def __init__(self, length, popfunc=None, winfunc=None):
+        bits = round(math.log(length)/math.log(2))
+        assert 2**bits == length, "Length must be an integer power of two"
+        self.dboffset = 0               # Offset for dB calculation
+        self.precision = STANDARD       # Ignored
+        self._length = length
+        self.popfunc = popfunc          # Function to acquire data
+        self.re = array.array('f', (0 for x in range(length)))
+        self.im = array.array('f', (0 for x in range(length)))
+        self.qre = array.array('h', (0 for x in range(length)))  # Q15 block
+        self.qim = array.array('h', (0 for x in range(length)))
+        self.exponent = 0               # Block exponent: value = q*2**exponent
+        if winfunc is not None:  # Float coefficients and a fixed point copy
+            self.windata = array.array('f', (winfunc(x, length) for x in range(length)))
+            # Q14 unless coefficients exceed 2.0 (e.g. amplitude compensated
+            # windows): then fewer fractional bits.
+            peak = max(abs(w) for w in self.windata)
+            self._wbits = 14
+            while round(peak*2**self._wbits) > 32767:
+                self._wbits -= 1
+            self.qwin = array.array('h', (round(w*2**self._wbits) for w in self.windata))
+        else:
+            self.windata = None
+            self.qwin = None
+        self.scale = 1/length           # Scaling of forward transform
+        self._mult = 1.0                # Scaling of last transform
+        self._tw = _twiddles(length)
+        self._fctrl = array.array('i', [length, 1])
+        self._wctrl = array.array('i', [0, 0])
+        self._cctrl = array.array('i', [0, 0, 0])
+        self._pctrl = array.array('i', [length//2, ITERATIONS, addressof(self.re),
+                                        addressof(self.im)])
+
+    @property
+    def length(self):
+        return self._length  # Read only
+
+    def prepare(self, conversion=None):  # For compatibility: tables are built by the constructor
+        pass
+
+    # Remove the mean and apply the window to qre as per winapply(). Data is
+    # renormalised to use the full 16 bits. Returns the change in exponent.
+    def _window(self):
+        n = self._length
+        ctrl = self._wctrl
+        ctrl[0] = (qsum(self.qre, n) + n//2)//n
+        ctrl[1] = -1
+        acc = qwindow(self.qre, self.qwin, n, ctrl)  # Measure only
+        bits = 0
+        while acc >> bits:
+            bits += 1
+        ctrl[1] = max(0, bits - 15)
+        qwindow(self.qre, self.qwin, n, ctrl)
+        return ctrl[1] - self._wbits
+
+    # Convert integers to floats multiplying by mult*2**exp
+    def _tofloat(self, src, dst, n, mult, exp, wide=0):
+        m, k = math.frexp(mult)
+        mq = round(m*32768)
+        if mq == 32768:
+            mq = 16384
+            k += 1
+        ctrl = self._cctrl
+        ctrl[0] = mq
+        ctrl[1] = k - 15 + exp
+        ctrl[2] = wide
+        tofloat(src, dst, n, ctrl)
+
+    def run(self, conversion):
+        if conversion not in (FORWARD, REVERSE, POLAR, DB):
+            raise ValueError('Unsupported conversion')
+        if self.popfunc is not None:
+            self.popfunc(self)          # Populate the data (for fwd transfers, just the real data)
+        start = utime.ticks_us()
+        n = self._length
+        if conversion & FORWARD:        # Real data assumed
+            emax = maxexp(self.re, n)
+            tofixed(self.re, self.qre, n, emax)
+            qzero(self.qim, n)
+            exp = emax - 141
+            if self.qwin is not None:
+                exp += self._window()
+            self._mult = self.scale
+            self._fctrl[1] = 1
+        else:
+            emax = max(maxexp(self.re, n), maxexp(self.im, n))
+            tofixed(self.re, self.qre, n, emax)
+            tofixed(self.im, self.qim, n, emax)
+            exp = emax - 141
+            self._mult = 1.0
+            self._fctrl[1] = -1
+        self.exponent = exp + fixfft(self.qre, self.qim, self._tw, self._fctrl)
+        if (conversion & POLAR) != POLAR:
+            self._tofloat(self.qre, self.re, n, self._mult, self.exponent)
+            self._tofloat(self.qim, self.im, n, self._mult, self.exponent)
+        delta = utime.ticks_diff(utime.ticks_us(), start)
+        self.convert(conversion)
+        return delta
+
+    # Polar conversion of the integer results of the last run. Ignore complex
+    # conjugates: convert 1st half of arrays.
+    def convert(self, conversion):
+        if (conversion & POLAR) == POLAR:
+            half = self._length//2
+            qpolar(self.qre, self.qim, self._pctrl, _atans)
+            self._tofloat(self.re, self.re, half, self._mult/GAIN, self.exponent - 14, 1)
+            self._tofloat(self.im, self.im, half, 1.0, -28, 1)
+            if (conversion & DB) == DB:
+                for idx, val in enumerate(self.re[0:half]):
+                    self.re[idx] = -80.0 if val <= 0.0 else 20*math.log10(val) - self.dboffset
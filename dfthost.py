@@ -0,0 +1,219 @@
+# dfthost.py Host implementation of the DFT class using NumPy
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Runs under CPython on a PC. Provides the same interface, conversion types,
+# scaling and window handling as dftclass.py so that data captured on a board
+# may be analysed on a host with results matching those computed on the device.
+# Arithmetic is exact to double precision: the polar precision tiers of the
+# device are accepted for compatibility but have no effect.
+# The batch functions process many frames at once: each row of a 2D array is a
+# frame.
+
+import math
+import time
+import numpy as np
+
+# Conversion types: values and meanings as per dftclass.py
+REVERSE = 0             # Inverse transform (frequency to time domain)
+FORWARD = 1             # Forward transform
+POLAR   = 3             # bit 2: Polar conversion
+DB      = 7             # bit 3: Polar with dB conversion
+UNWRAP  = 11            # bit 4: Polar with unwrapped phase. May be ORed with DB
+GROUPDELAY = 27         # bit 5: Polar with group delay in place of phase. May be ORed with DB
+HREVERSE = 32           # bit 6: Inverse transform of bins 0..N/2 to a real signal
+CEPSTRUM = 65           # bit 7: Real cepstrum: reverse transform of log magnitude
+AUTOCORR = 129          # bit 8: Autocorrelation: reverse transform of power spectrum
+
+# Polar precision tiers (ignored)
+FAST = 0
+STANDARD = 1
+PRECISE = 2
+NOSQRT = 4
+
+PYBOARD_DBOFFSET = 59   # See dftclass.py
+
+# Window functions with the same signature as those used with the device.
+# Coherent gain is compensated.
+def hann(x, length):
+    return 1 - math.cos(2*math.pi*x/(length - 1))
+
+def hamming(x, length):
+    return (0.54 - 0.46*math.cos(2*math.pi*x/(length - 1)))/0.54
+
+def blackman(x, length):
+    a = 2*math.pi*x/(length - 1)
+    return (0.42 - 0.5*math.cos(a) + 0.08*math.cos(2*a))/0.42
+
+WINDOWS = {'hann': hann, 'hamming': hamming, 'blackman': blackman}
+
+def windata(winfunc, length):  # Array of window coefficients
+    return np.array([winfunc(x, length) for x in range(length)])
+
+# ******************** Batch functions ********************
+
+# Forward transform of real frames. As per winapply() the mean of each frame is
+# removed before the window is applied. Returns complex spectra scaled by scale
+# (default 1/length).
+def forward(frames, window=None, scale=None):
+    frames = np.asarray(frames, dtype=np.float64)
+    length = frames.shape[-1]
+    if window is not None:
+        frames = (frames - frames.mean(axis=-1, keepdims=True))*window
+    return np.fft.fft(frames, axis=-1)*(1/length if scale is None else scale)
+
+# Polar, unwrap and dB stages of a conversion applied to the first half of each
+# row of re and im, modifying them in place.
+def convert(re, im, conversion, dboffset=0, phasethresh=0.0):
+    if (conversion & POLAR) != POLAR:
+        return
+    half = re.shape[-1]//2
+    x = re[..., :half]
+    y = im[..., :half]
+    mag = np.hypot(x, y)
+    y[...] = np.arctan2(y, x)
+    x[...] = mag
+    if (conversion & UNWRAP) == UNWRAP:
+        unwrap(x, y, phasethresh, (conversion & GROUPDELAY) == GROUPDELAY)
+    if (conversion & DB) == DB:
+        with np.errstate(divide='ignore'):
+            x[...] = np.where(x > 0, 20*np.log10(np.where(x > 0, x, 1)) - dboffset, -80.0)
+
+# Phase unwrapping as per polar.unwrap(). Bins whose magnitude is <= threshold
+# hold the phase of the last valid bin or have zero group delay.
+def unwrap(mag, phase, threshold=0.0, delay=False):
+    mag = np.atleast_2d(mag)
+    phase = np.atleast_2d(phase)
+    bins = phase.shape[-1]
+    for m, p in zip(mag, phase):
+        valid = np.flatnonzero(m > threshold)
+        out = np.zeros(bins)
+        if valid.size:
+            u = np.unwrap(p[valid])
+            if delay:
+                if valid.size > 1:  # Bin spacing is pi/bins radians per sample
+                    d = np.diff(u)/np.diff(valid)*(-bins/math.pi)
+                    out[valid[1:]] = d
+                    out[valid[0]] = d[0]
+            else:
+                last = np.searchsorted(valid, np.arange(bins), side='right') - 1
+                out = np.where(last >= 0, u[np.maximum(last, 0)], 0.0)
+        p[...] = out
+
+# Forward conversion of a 2D array of real frames. Returns re, im as 2D float
+# arrays with the layout the device would produce.
+def spectra(frames, conversion, window=None, scale=None, dboffset=0, phasethresh=0.0):
+    z = forward(frames, window, scale)
+    re = np.ascontiguousarray(z.real)
+    im = np.ascontiguousarray(z.imag)
+    convert(re, im, conversion, dboffset, phasethresh)
+    return re, im
+
+# ******************** DFT class ********************
+
+class DFT(object):
+    def __init__(self, length, popfunc=None, winfunc=None):
+        bits = round(math.log(length)/math.log(2))
+        assert 2**bits == length, "Length must be an integer power of two"
+        self.dboffset = 0               # Offset for dB calculation
+        self.precision = STANDARD       # Ignored
+        self.phasethresh = 0.0          # Magnitude threshold for phase unwrapping
+        self._length = length
+        self.popfunc = popfunc          # Function to acquire data
+        self.re = np.zeros(length)
+        self.im = np.zeros(length)
+        self.windata = None if winfunc is None else windata(winfunc, length)
+        self.scale = 1/length
+
+    @property
+    def length(self):
+        return self._length  # Read only
+
+    def prepare(self, conversion=None):  # For compatibility: nothing is deferred
+        pass
+
+    def run(self, conversion):
+        if self.popfunc is not None:
+            self.popfunc(self)
+        start = time.perf_counter()
+        n = self._length
+        if conversion == REVERSE:
+            z = np.fft.ifft(self.re + 1j*self.im)*n
+        elif conversion == HREVERSE:
+            z = np.fft.irfft(self.re[:n//2 + 1] + 1j*self.im[:n//2 + 1], n)*n
+        elif conversion & ~(FORWARD | DB | UNWRAP | GROUPDELAY):
+            if conversion not in (CEPSTRUM, AUTOCORR):
+                raise ValueError('Unsupported conversion')
+            z = forward(self.re, self.windata, self.scale)[:n//2 + 1]
+            if conversion == AUTOCORR:
+                z = np.fft.irfft(np.abs(z)**2, n)*n
+            else:  # Zero magnitude has a log of -44 as per polar.logmag()
+                with np.errstate(divide='ignore'):
+                    z = np.fft.irfft(np.maximum(np.log(np.abs(z)), -44.0), n)
+        else:
+            z = forward(self.re, self.windata, self.scale)
+        self.re[:] = z.real
+        self.im[:] = z.imag if np.iscomplexobj(z) else 0.0
+        delta = round((time.perf_counter() - start)*1000000)
+        self.convert(conversion)
+        return delta
+
+    def convert(self, conversion):
+        convert(self.re, self.im, conversion, self.dboffset, self.phasethresh)
+
+# Two dimensional transform: interface as per dftclass.DFT2D. re and im are 1D
+# arrays holding the data by rows.
+class DFT2D(object):
+    def __init__(self, rows, cols, popfunc=None, winfunc=None):
+        for n in (rows, cols):
+            bits = round(math.log(n)/math.log(2))
+            assert 2**bits == n, "Dimensions must be integer powers of two"
+        self.dboffset = 0               # Offset for dB calculation
+        self.precision = STANDARD       # Ignored
+        self._rows = rows
+        self._cols = cols
+        self.popfunc = popfunc
+        self.re = np.zeros(rows*cols)
+        self.im = np.zeros(rows*cols)
+        if winfunc is None:
+            self.windata = None
+        else:  # Separable window
+            self.windata = np.outer(windata(winfunc, rows), windata(winfunc, cols)).ravel()
+
+    @property
+    def rows(self):
+        return self._rows  # Read only
+
+    @property
+    def cols(self):
+        return self._cols
+
+    def run(self, conversion):
+        if conversion not in (FORWARD, REVERSE, POLAR, DB):
+            raise ValueError('Unsupported conversion')
+        if self.popfunc is not None:
+            self.popfunc(self)
+        start = time.perf_counter()
+        shape = (self._rows, self._cols)
+        if conversion == REVERSE:
+            z = np.fft.ifft2((self.re + 1j*self.im).reshape(shape))*self.re.size
+        else:
+            data = self.re
+            if self.windata is not None:
+                data = (data - data.mean())*self.windata
+            z = np.fft.fft2(data.reshape(shape))/self.re.size
+        self.re[:] = z.real.ravel()
+        self.im[:] = z.imag.ravel()
+        delta = round((time.perf_counter() - start)*1000000)
+        self.convert(conversion)
+        return delta
+
+    def convert(self, conversion):      # Polar conversion of the entire arrays
+        if (conversion & POLAR) == POLAR:
+            mag = np.hypot(self.re, self.im)
+            self.im[:] = np.arctan2(self.im, self.re)
+            self.re[:] = mag
+            if (conversion & DB) == DB:
+                with np.errstate(divide='ignore'):
+                    self.re[:] = np.where(mag > 0, 20*np.log10(np.where(mag > 0, mag, 1))
+                                          - self.dboffset, -80.0)
@@ -0,0 +1,219 @@
+# dftpack.py Compact binary serialisation of spectra
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Packs the first N/2 bins of a DFT instance's re array (and optionally im) into
+# a binary frame for transmission over a UART or radio link. Values are
+# quantised to int8 or int16. With delta encoding, frames after a key frame
+# hold the change in each quantised value since the previous frame as an int8:
+# int16 resolution is then transmitted at int8 bandwidth. Where a change is out
+# of range a key frame is sent instead. Frames are encoded into a preallocated
+# bytearray: pack() does not allocate.
+# Decode on a host with dftunpack.py.
+
+# Frame format (little-endian):
+# Header
+# 0  2 bytes Magic b'DF'
+# 2  byte    Flags: bit 0 int16 values, bit 1 delta frame, bit 2 im included
+# 3  byte    Sequence no. (modulo 256)
+# 4  uint32  Transform length N
+# 8  float   Sample rate
+# 12 float   dboffset
+# 16 float   Quantisation step of re values
+# 20 float   Quantisation step of im values
+# 24 Payload: N/2 re values followed by N/2 im values if included. A value is
+# the quantised value multiplied by the step. Delta frames hold int8 changes
+# in quantised values.
+
+import array
+import math
+import struct
+from uctypes import addressof
+
+INT8 = const(0)
+INT16 = const(1)
+
+HEADER = '<2sBBIffff'
+HDRSIZE = const(24)
+MAGIC = b'DF'
+# Flags
+F_INT16 = const(1)
+F_DELTA = const(2)
+F_IMAG = const(4)
+
+# Quantise a float array to a 16 bit integer array:
+# dest = round(src*scale) clamped to lo..hi
+# r0: source float array
+# r1: destination integer array ('h')
+# r2: length
+# r3: float array: scale, lo, hi, 0.5, 0.0
+@micropython.asm_thumb
+def quantise(r0, r1, r2, r3):
+    vldr(s1, [r3, 0])       # scale
+    vldr(s2, [r3, 4])       # lo
+    vldr(s3, [r3, 8])       # hi
+    vldr(s4, [r3, 12])      # 0.5
+    vldr(s5, [r3, 16])      # 0.0
+    label(LOOP)
+    vldr(s0, [r0, 0])
+    vmul(s0, s0, s1)
+    vcmp(s0, s2)
+    vmrs(APSR_nzcv, FPSCR)
+    it(lt)                  # Also true for NaN
+    vldr(s0, [r3, 4])
+    vcmp(s0, s3)
+    vmrs(APSR_nzcv, FPSCR)
+    it(gt)
+    vldr(s0, [r3, 8])
+    vcmp(s0, s5)            # Round half away from zero
+    vmrs(APSR_nzcv, FPSCR)
+    ite(lt)
+    vsub(s0, s0, s4)
+    vadd(s0, s0, s4)
+    vcvt_s32_f32(s0, s0)
+    vmov(r4, s0)
+    strh(r4, [r1, 0])
+    add(r0, 4)
+    add(r1, 2)
+    sub(r2, 1)
+    bgt(LOOP)
+
+# Store quantised values in a frame. Returns 0 on success. In delta mode
+# returns 1 if a change is outside the int8 range: the frame is incomplete.
+# r0: integer control array
+# ctrl[0] = No. of values
+# ctrl[1] = address of current quantised values ('h' array)
+# ctrl[2] = address of previous quantised values (delta mode)
+# ctrl[3] = address of destination
+# ctrl[4] = mode: 0 int8, 1 int16, 2 int8 delta
+@micropython.asm_thumb
+def encode(r0):
+    ldr(r1, [r0, 4])
+    ldr(r2, [r0, 8])
+    ldr(r3, [r0, 12])
+    ldr(r4, [r0, 16])
+    ldr(r0, [r0, 0])
+    cmp(r4, 1)
+    beq(HALF)
+    bgt(DELTA)
+    label(BYTE)
+    ldrh(r5, [r1, 0])
+    strb(r5, [r3, 0])       # Low byte
+    add(r1, 2)
+    add(r3, 1)
+    sub(r0, 1)
+    bgt(BYTE)
+    b(DONE)
+
+    label(HALF)
+    ldrh(r5, [r1, 0])
+    strh(r5, [r3, 0])
+    add(r1, 2)
+    add(r3, 2)
+    sub(r0, 1)
+    bgt(HALF)
+    b(DONE)
+
+    label(DELTA)
+    mov(r7, 127)
+    mov(r4, 128)
+    label(LOOP)
+    ldrh(r5, [r1, 0])
+    lsl(r5, r5, 16)
+    asr(r5, r5, 16)         # Sign extend current
+    ldrh(r6, [r2, 0])
+    lsl(r6, r6, 16)
+    asr(r6, r6, 16)         # Previous
+    sub(r5, r5, r6)         # Change
+    cmp(r5, r7)
+    bgt(OVF)
+    add(r6, r5, r4)
+    bmi(OVF)                # Change < -128
+    strb(r5, [r3, 0])
+    add(r1, 2)
+    add(r2, 2)
+    add(r3, 1)
+    sub(r0, 1)
+    bgt(LOOP)
+
+    label(DONE)
+    mov(r0, 0)
+    b(END)
+    label(OVF)
+    mov(r0, 1)
+    label(END)
+
+class Packer:
+    # dft: DFT instance. rate: sample rate for the header. width: INT8 or INT16.
+    # delta: use delta encoding. imag: include im. restep, imstep: quantisation
+    # steps (default 1dB or 0.01dB for re, pi/127 or pi/32767 radians for im).
+    # keyint: in delta mode, max no. of frames between key frames (0: no limit).
+    # floor: re values below this are sent as floor. In delta mode with dB
+    # spectra this avoids key frames caused by fluctuations in the noise floor.
+    def __init__(self, dft, rate=0, width=INT8, delta=False, imag=False,
+                 restep=None, imstep=None, keyint=16, floor=None):
+        self.dft = dft
+        self.keyint = keyint
+        bins = dft.length//2
+        nvals = bins*2 if imag else bins
+        int16 = width == INT16
+        if restep is None:
+            restep = 0.01 if int16 else 1.0
+        if imstep is None:
+            imstep = math.pi/(32767 if int16 else 127)
+        lim = 32767 if int16 else 127
+        lo = -lim - 1 if floor is None else max(-lim - 1, round(floor/restep))
+        self._reconsts = array.array('f', [1/restep, lo, lim, 0.5, 0.0])
+        self._imconsts = array.array('f', [1/imstep, -lim - 1, lim, 0.5, 0.0])
+        self._flags = (F_INT16 if int16 else 0) | (F_IMAG if imag else 0)
+        self._imag = imag
+        self._delta = delta
+        self._width = width
+        self._bins = bins
+        keysize = HDRSIZE + nvals*(2 if int16 else 1)
+        self.frame = bytearray(keysize)
+        struct.pack_into(HEADER, self.frame, 0, MAGIC, self._flags, 0, dft.length,
+                         rate, dft.dboffset, restep, imstep)
+        mv = memoryview(self.frame)
+        self._views = (mv[:HDRSIZE + nvals], mv)  # Delta, key frames
+        # Quantised values of current and previous frames. Roles alternate.
+        self._q = (array.array('h', (0 for _ in range(nvals))),
+                   array.array('h', (0 for _ in range(nvals))))
+        self._qim = (memoryview(self._q[0])[bins:], memoryview(self._q[1])[bins:])
+        self._addr = (addressof(self._q[0]), addressof(self._q[1]))
+        self._ctrl = array.array('i', [nvals, 0, 0, addressof(self.frame) + HDRSIZE, 0])
+        self._cur = 0
+        self._seq = 0
+        self._count = 0  # Frames since key frame
+
+    # Encode the current contents of the DFT arrays. Returns a memoryview of the
+    # frame which is valid until the next call.
+    def pack(self):
+        dft = self.dft
+        cur = self._cur
+        quantise(dft.re, self._q[cur], self._bins, self._reconsts)
+        if self._imag:
+            quantise(dft.im, self._qim[cur], self._bins, self._imconsts)
+        ctrl = self._ctrl
+        ctrl[1] = self._addr[cur]
+        ctrl[2] = self._addr[cur ^ 1]
+        key = 1
+        if self._delta and self._count and (self.keyint == 0 or self._count < self.keyint):
+            ctrl[4] = 2
+            key = encode(ctrl)  # 1 on overflow
+        if key:
+            ctrl[4] = self._width
+            encode(ctrl)
+            self._count = 0
+        self._count += 1
+        frame = self.frame
+        frame[2] = self._flags if key else self._flags | F_DELTA
+        frame[3] = self._seq
+        struct.pack_into('<f', frame, 12, dft.dboffset)  # May have changed since construction
+        self._seq = (self._seq + 1) & 0xff
+        self._cur = cur ^ 1
+        return self._views[key]
+
+    # Force the next frame to be a key frame e.g. after a transmission error.
+    def reset(self):
+        self._count = 0
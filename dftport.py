@@ -0,0 +1,188 @@
+# dftport.py Viper and native code versions of the DFT kernels
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Portable replacements for the assembler kernels, used by dftclass.py on
+# platforms where the assembler cannot run but the native code emitter is
+# available (e.g. ESP32, ESP8266, RP2040). Unlike dft.py this module can be
+# frozen as bytecode. Float arithmetic uses the native code emitter: it still
+# operates on boxed floats accessed via uctypes, so it allocates and is only
+# marginally faster than dftpy.py (dftbench.py compares them). Copies and
+# integer to float conversion use Viper pointer operations on 32 bit words and
+# do not allocate. Functions not defined here are the pure Python versions in
+# dftpy.py. Polar conversion uses math.atan2() and math.sqrt(): the precision
+# tiers have no effect.
+
+import array
+import math
+from dftpy import floats, hermitian, unwrap, logmag, FAST, STANDARD, PRECISE, NOSQRT
+from dftfixed import tofloat
+
+# Cooley-Tukey transform in place as per dftpy.fft()
+@micropython.native
+def fft(ctrl, conversion):
+    n = ctrl[0]
+    bits = ctrl[1]
+    re = floats(ctrl[2], n)
+    im = floats(ctrl[3], n)
+    roots = ctrl[4]//4
+    cmplx = floats(ctrl[5], roots + 2*(bits + 1))
+    forward = conversion & 1
+    j = 0
+    for i in range(n - 1):          # Bit reversal
+        if i < j:
+            re[i], re[j] = re[j], re[i]
+            im[i], im[j] = im[j], im[i]
+        k = n >> 1
+        while k <= j:
+            j -= k
+            k >>= 1
+        j += k
+    l2 = 1
+    for l in range(bits):
+        cr = cmplx[roots + 2*l]
+        ci = cmplx[roots + 2*l + 1]
+        if forward:
+            ci = -ci
+        l1 = l2
+        l2 <<= 1
+        ur = 1.0
+        ui = 0.0
+        for j in range(l1):
+            i = j
+            while i < n:
+                i1 = i + l1
+                tr = ur*re[i1] - ui*im[i1]
+                ti = ur*im[i1] + ui*re[i1]
+                re[i1] = re[i] - tr
+                im[i1] = im[i] - ti
+                re[i] += tr
+                im[i] += ti
+                i += l2
+            ur, ui = ur*cr - ui*ci, ur*ci + ui*cr
+    if forward:
+        scale = cmplx[12]
+        for i in range(n):
+            re[i] *= scale
+            im[i] *= scale
+
+# Stockham autosort transform as per dftpy.stockham()
+@micropython.native
+def stockham(ctrl, conversion):
+    n = ctrl[0]
+    bits = ctrl[1]
+    xr = floats(ctrl[2], n)
+    xi = floats(ctrl[3], n)
+    yr = floats(ctrl[6], n)
+    yi = floats(ctrl[7], n)
+    roots = ctrl[4]//4
+    cmplx = floats(ctrl[5], roots + 2*(bits + 1))
+    forward = conversion & 1
+    half = n >> 1
+    s = 1
+    l = bits - 1
+    while l >= 0:
+        cr = cmplx[roots + 2*l]
+        ci = cmplx[roots + 2*l + 1]
+        if forward:
+            ci = -ci
+        wr = 1.0
+        wi = 0.0
+        a = 0
+        d = 0
+        while a < half:
+            for q in range(s):
+                b = a + half
+                e = d + s
+                ar = xr[a]
+                ai = xi[a]
+                br = xr[b]
+                bi = xi[b]
+                yr[d] = ar + br
+                yi[d] = ai + bi
+                ar -= br
+                ai -= bi
+                yr[e] = ar*wr - ai*wi
+                yi[e] = ar*wi + ai*wr
+                a += 1
+                d += 1
+            d += s
+            wr, wi = wr*cr - wi*ci, wr*ci + wi*cr
+        xr, yr = yr, xr
+        xi, yi = yi, xi
+        s <<= 1
+        l -= 1
+    if forward or bits & 1:         # Copy back, scaling forward transforms
+        scale = cmplx[12] if forward else 1.0
+        re = floats(ctrl[2], n)
+        im = floats(ctrl[3], n)
+        for i in range(n):
+            re[i] = xr[i]*scale
+            im[i] = xi[i]*scale
+
+# re[2n] = re[n], re[2n+1] = im[n] for n in range(m)
+@micropython.viper
+def interleave(re, im, m: int):
+    r = ptr32(re)
+    x = ptr32(im)
+    n = m - 1
+    while n >= 0:
+        r[2*n + 1] = x[n]
+        r[2*n] = r[n]
+        n -= 1
+
+@micropython.native
+def winapply(re, win, length):
+    mean = 0.0
+    for i in range(length):
+        mean += re[i]
+    mean /= length
+    for i in range(length):
+        re[i] = (re[i] - mean)*win[i]
+
+@micropython.native
+def setarray(arr, value, length):
+    value = float(value)
+    for i in range(length):
+        arr[i] = value
+
+_ictrl = array.array('i', [16384, -14, 1])  # Multiply by 1.0, 32 bit source
+
+def icopy(src, dst, length):        # src and dst may be the same array
+    tofloat(src, dst, length, _ictrl)
+
+# Strided copy of 32 bit words as per window.scopy()
+@micropython.viper
+def scopy(ctrl):
+    c = ptr32(ctrl)
+    n = c[0]
+    ss = c[3] >> 2
+    ds = c[6] >> 2
+    sr = ptr32(c[1])
+    si = ptr32(c[2])
+    dr = ptr32(c[4])
+    di = ptr32(c[5])
+    s = 0
+    d = 0
+    while n > 0:
+        dr[d] = sr[s]
+        di[d] = si[s]
+        s += ss
+        d += ds
+        n -= 1
+
+@micropython.native
+def topolar(re, im, length, precision=STANDARD):
+    for i in range(length):
+        x = re[i]
+        y = im[i]
+        re[i] = math.sqrt(x*x + y*y)
+        im[i] = math.atan2(y, x)
+
+@micropython.native
+def powerspec(re, im, length):
+    for i in range(length):
+        x = re[i]
+        y = im[i]
+        re[i] = x*x + y*y
+        im[i] = 0.0
@@ -0,0 +1,295 @@
+# dftpy.py Pure Python versions of the DFT kernels
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Portable equivalents of the assembler functions in dft.py, window.py,
+# polar.py and blockstats.py, taking the same arguments and producing the same
+# results. dftclass.py uses them on platforms where the assembler cannot run and
+# the native code emitter is unavailable. The module contains no assembler or
+# emitter decorators so it runs on any port and may be frozen as bytecode. dftport.py
+# replaces the time critical functions with Viper and native code versions.
+# Functions whose control arrays hold addresses access memory via uctypes.
+# Unlike the assembler these functions allocate (floats are objects) so they
+# cannot be called from an interrupt handler. Polar conversion uses math.atan2()
+# and math.sqrt(): the precision tiers have no effect.
+
+import math
+import uctypes
+
+FAST = const(0)
+STANDARD = const(1)
+PRECISE = const(2)
+NOSQRT = const(4)
+
+# Access n floats or 32 bit words at an address
+def floats(addr, n):
+    return uctypes.struct(addr, {'a': (uctypes.ARRAY | 0, uctypes.FLOAT32 | n)}).a
+
+def words(addr, n):
+    return uctypes.struct(addr, {'a': (uctypes.ARRAY | 0, uctypes.UINT32 | n)}).a
+
+def ints(addr, n):
+    return uctypes.struct(addr, {'a': (uctypes.ARRAY | 0, uctypes.INT32 | n)}).a
+
+# ******************** dft.py ********************
+
+# Cooley-Tukey transform in place as per algorithms.fft(). See dftclass.py for
+# the control array. Forward transforms are scaled by cmplx[12].
+def fft(ctrl, conversion):
+    n = ctrl[0]
+    bits = ctrl[1]
+    re = floats(ctrl[2], n)
+    im = floats(ctrl[3], n)
+    roots = ctrl[4]//4              # Word offset of roots of unity
+    cmplx = floats(ctrl[5], roots + 2*(bits + 1))
+    forward = conversion & 1
+    j = 0
+    for i in range(n - 1):          # Bit reversal
+        if i < j:
+            re[i], re[j] = re[j], re[i]
+            im[i], im[j] = im[j], im[i]
+        k = n >> 1
+        while k <= j:
+            j -= k
+            k >>= 1
+        j += k
+    l2 = 1
+    for l in range(bits):
+        cr = cmplx[roots + 2*l]
+        ci = cmplx[roots + 2*l + 1]
+        if forward:
+            ci = -ci
+        l1 = l2
+        l2 <<= 1
+        ur = 1.0
+        ui = 0.0
+        for j in range(l1):
+            for i in range(j, n, l2):
+                i1 = i + l1
+                tr = ur*re[i1] - ui*im[i1]
+                ti = ur*im[i1] + ui*re[i1]
+                re[i1] = re[i] - tr
+                im[i1] = im[i] - ti
+                re[i] += tr
+                im[i] += ti
+            ur, ui = ur*cr - ui*ci, ur*ci + ui*cr
+    if forward:
+        scale = cmplx[12]
+        for i in range(n):
+            re[i] *= scale
+            im[i] *= scale
+
+# Stockham autosort transform as per dft.stockham(). Scratch arrays are at
+# ctrl[6] and ctrl[7].
+def stockham(ctrl, conversion):
+    n = ctrl[0]
+    bits = ctrl[1]
+    x = (floats(ctrl[2], n), floats(ctrl[3], n))
+    y = (floats(ctrl[6], n), floats(ctrl[7], n))
+    data = x
+    roots = ctrl[4]//4
+    cmplx = floats(ctrl[5], roots + 2*(bits + 1))
+    forward = conversion & 1
+    half = n >> 1
+    s = 1
+    for l in range(bits - 1, -1, -1):
+        xr, xi = x
+        yr, yi = y
+        cr = cmplx[roots + 2*l]
+        ci = cmplx[roots + 2*l + 1]
+        if forward:
+            ci = -ci
+        wr = 1.0
+        wi = 0.0
+        a = 0                       # q + s*p
+        d = 0                       # q + 2*s*p
+        for p in range(half//s):
+            for q in range(s):
+                b = a + half
+                e = d + s
+                ar = xr[a]
+                ai = xi[a]
+                br = xr[b]
+                bi = xi[b]
+                yr[d] = ar + br
+                yi[d] = ai + bi
+                ar -= br
+                ai -= bi
+                yr[e] = ar*wr - ai*wi
+                yi[e] = ar*wi + ai*wr
+                a += 1
+                d += 1
+            d += s
+            wr, wi = wr*cr - wi*ci, wr*ci + wi*cr
+        x, y = y, x
+        s <<= 1
+    if forward or x is not data:    # Copy back, scaling forward transforms
+        scale = cmplx[12] if forward else 1.0
+        xr, xi = x
+        re, im = data
+        for i in range(n):
+            re[i] = xr[i]*scale
+            im[i] = xi[i]*scale
+
+# Combine the even and odd parts of bins 0..M of a spectrum into an M point
+# complex spectrum. See dft.py.
+def hermitian(ctrl):
+    m = ctrl[0]
+    re = floats(ctrl[1], m + 1)
+    im = floats(ctrl[2], m + 1)
+    rot = floats(ctrl[3], 2)
+    cr = rot[0]
+    ci = rot[1]
+    wr = 1.0
+    wi = 0.0
+    for k in range(m//2 + 1):
+        ar = re[k]
+        ai = im[k]
+        br = re[m - k]
+        bi = im[m - k]
+        er = ar + br                # E = X[k] + conj(X[M-k])
+        ei = ai - bi
+        dr = ar - br
+        di = ai + bi
+        orr = dr*wr - di*wi         # O = D*W**k
+        oi = dr*wi + di*wr
+        re[k] = er - oi             # Z[k] = E + jO
+        im[k] = ei + orr
+        re[m - k] = er + oi         # Z[M-k] = conj(E) + j*conj(O)
+        im[m - k] = orr - ei
+        wr, wi = wr*cr - wi*ci, wr*ci + wi*cr
+
+# re[2n] = re[n], re[2n+1] = im[n] for n in range(m)
+def interleave(re, im, m):
+    for n in range(m - 1, -1, -1):
+        re[2*n + 1] = im[n]
+        re[2*n] = re[n]
+
+# ******************** window.py ********************
+
+# Remove the mean and multiply by the window coefficients
+def winapply(re, win, length):
+    mean = sum(re[i] for i in range(length))/length
+    for i in range(length):
+        re[i] = (re[i] - mean)*win[i]
+
+def setarray(arr, value, length):
+    value = float(value)
+    for i in range(length):
+        arr[i] = value
+
+# Convert 32 bit integers to floats as per window.icopy(). The floats are
+# written to the memory of dst whatever its type: src and dst may be the same
+# integer array, which then holds floats (as used by DFTADC with decimation).
+def icopy(src, dst, length):
+    d = floats(uctypes.addressof(dst), length)
+    for i in range(length):
+        d[i] = src[i]
+
+def scopy(ctrl):                    # Strided copy of 32 bit words
+    n = ctrl[0]
+    ss = ctrl[3]//4
+    ds = ctrl[6]//4
+    for src, dst in ((1, 4), (2, 5)):
+        s = words(ctrl[src], (n - 1)*ss + 1)
+        d = words(ctrl[dst], (n - 1)*ds + 1)
+        for i in range(n):
+            d[i*ds] = s[i*ss]
+
+# ******************** polar.py ********************
+
+def topolar(re, im, length, precision=STANDARD):
+    for i in range(length):
+        x = re[i]
+        y = im[i]
+        re[i] = math.sqrt(x*x + y*y)
+        im[i] = math.atan2(y, x)
+
+# Phase unwrapping or group delay as per polar.unwrap()
+def unwrap(re, im, length, threshold=0.0, delay=False):
+    scale = -length/math.pi         # Bin spacing is pi/length radians per sample
+    nvalid = 0                      # Valid bins so far (max 2)
+    first = 0                       # Index of first valid bin
+    offset = 0.0                    # Multiple of 2*pi
+    prev = 0.0                      # Raw phase of last valid bin
+    last = 0.0                      # Unwrapped phase of last valid bin
+    gap = 0                         # Bins since last valid bin
+    for i in range(length):
+        gap += 1
+        raw = im[i]
+        if re[i] <= threshold:      # Ignored bin
+            im[i] = 0.0 if delay else last
+            continue
+        if nvalid:
+            change = raw - prev
+            if change > math.pi:
+                offset -= 2*math.pi
+            elif change < -math.pi:
+                offset += 2*math.pi
+            phase = raw + offset
+            if delay:
+                im[i] = (phase - last)/gap*scale
+                if nvalid == 1:     # Second valid bin: set delay of first
+                    im[first] = im[i]
+                    nvalid = 2
+            else:
+                im[i] = phase
+        else:
+            nvalid = 1
+            first = i
+            phase = raw
+            im[i] = 0.0 if delay else phase
+        prev = raw
+        last = phase
+        gap = 0
+
+def powerspec(re, im, length):
+    for i in range(length):
+        re[i] = re[i]*re[i] + im[i]*im[i]
+        im[i] = 0.0
+
+# Natural log of magnitude multiplied by scale. A zero magnitude produces
+# -44.0*scale as per polar.logmag().
+def logmag(re, im, length, scale=1.0):
+    for i in range(length):
+        p = re[i]*re[i] + im[i]*im[i]
+        re[i] = (0.5*math.log(p) if p > 0 else -44.0)*scale
+        im[i] = 0.0
+
+# ******************** blockstats.py ********************
+
+# Statistics of a block of integer samples relative to ctrl[3] as per
+# blockstats.blockstats()
+def blockstats(ctrl):
+    n = ctrl[0]
+    x = ints(ctrl[1], n)
+    k = ctrl[3]
+    hi = lo = x[0]
+    s = 0.0
+    ss = 0.0
+    for i in range(n):
+        v = x[i]
+        hi = max(hi, v)
+        lo = min(lo, v)
+        v -= k
+        s += v
+        ss += v*v
+    res = floats(ctrl[2], 4)
+    res[0] = s
+    res[1] = ss
+    res[2] = hi - k
+    res[3] = lo - k
+
+# Sum of Goertzel powers at one or more frequencies as per blockstats.goertzel()
+def goertzel(ctrl):
+    n = ctrl[0]
+    x = ints(ctrl[1], n)
+    k = ctrl[3]
+    total = 0.0
+    for c in floats(ctrl[2], ctrl[4]):
+        s1 = 0.0
+        s2 = 0.0
+        for i in range(n):
+            s1, s2 = x[i] - k + c*s1 - s2, s1
+        total += s1*s1 + s2*s2 - c*s1*s2
+    floats(ctrl[5], 1)[0] = total
@@ -3,7 +3,7 @@
 # 5th Feb 2018
 
 import math
-from dftclass import DFT, FORWARD, REVERSE, POLAR, DB
+from dftclass import DFT, DFT2D, FORWARD, REVERSE, HREVERSE, POLAR, DB, UNWRAP, GROUPDELAY
 
 # *********************** Pretty print **********************
 
@@ -15,6 +15,10 @@ test()  Forward polar transform. Output in bins 0, 4.
 dbtest()  dB conversion of above.
 dbhann()  Test of hanning (hann) window.
 trev()  Test reverse transform. Single cosine cycle.
+hrev()  Real reverse transform of bins 0..N/2. As per trev().
+unwrapped()  Unwrapped phase of a delayed impulse.
+delay()  Group delay of a delayed impulse.
+twod()  2D polar transform of an 8x16 array. Output in bins [1, 3], [7, 13].
 bench() Benchmark: time a 1K forward transform.
 '''
     print('\x1b[32m')
@@ -69,6 +73,18 @@ def revtest(objDFT):
     objDFT.re[1] = 10
     objDFT.re[objDFT.length -1] = 10
 
+# As above but conjugates are implied: only bins 0..N/2 are populated
+def hrevtest(objDFT):
+    for x in range(objDFT.length//2 + 1):
+        objDFT.re[x] = 0
+        objDFT.im[x] = 0
+    objDFT.re[1] = 10
+
+# Populate with an impulse delayed by 5 samples
+def acqu_impulse(objDFT):
+    for x in range(objDFT.length):
+        objDFT.re[x] = 1 if x == 5 else 0
+
 # ************************** TESTS **************************
 
 # Forward transform
@@ -111,6 +127,51 @@ def trev():
     mydft.run(REVERSE)
     cartesian_print(mydft)
 
+def hrev():
+    printexp('Single cosine wave amplitude 20. Imaginary data zero.')
+    mydft = DFT(128, hrevtest)
+    mydft.run(HREVERSE)
+    cartesian_print(mydft)
+
+# Unwrapped phase
+def unwrapped():
+    printexp('''Magnitude 0.01 in all bins.
+Phase falls linearly by 14.06 degs per bin.''')
+    mydft = DFT(128, acqu_impulse)
+    mydft.run(UNWRAP)
+    polarprint(mydft)
+
+# Group delay
+def delay():
+    printexp('Group delay 5.00 samples in all bins.')
+    mydft = DFT(128, acqu_impulse)
+    mydft.run(GROUPDELAY)
+    print("Bin       mag  delay (samples)")
+    fstr = "{:6d}{:8.2f}  {:8.2f}"
+    for x in range(mydft.length//2):
+        print(fstr.format(x, mydft.re[x], mydft.im[x]))
+
+# Populate an 8x16 2D array with DC + a plane wave of 1 cycle vertically and 3
+# horizontally
+def acqu_2d(objDFT):
+    for r in range(objDFT.rows):
+        for c in range(objDFT.cols):
+            objDFT.re[r*objDFT.cols + c] = 1 + 2*math.cos(2*math.pi*(r/objDFT.rows + 3*c/objDFT.cols))
+
+def twod():
+    printexp('''Bin [0, 0] magnitude 1.00
+Bins [1, 3] and [7, 13] magnitude 1.00 phase 0.
+Bins of zero magnitude are not printed.''')
+    mydft = DFT2D(8, 16, acqu_2d)
+    mydft.run(POLAR)
+    print("Row  Col     mag   phase")
+    fstr = "{:3d}{:5d}{:8.2f}{:8.2f}"
+    for r in range(mydft.rows):
+        for c in range(mydft.cols):
+            mag = mydft.re[r*mydft.cols + c]
+            if mag > 0.01:
+                print(fstr.format(r, c, mag, math.degrees(mydft.im[r*mydft.cols + c])))
+
 # 1K point benchmark
 def bench():
     printexp('''Bin 0 real 1.00 imag 0.00j
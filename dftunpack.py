@@ -0,0 +1,120 @@
+# dftunpack.py Host decoder for frames produced by dftpack.py
+# 19th Oct 2026
+# Released under the MIT license.
+
+# Runs under CPython (or MicroPython). See dftpack.py for the frame format.
+# Usage example reading from a serial port:
+# import serial
+# from dftunpack import Unpacker
+# u = Unpacker()
+# with serial.Serial('/dev/ttyACM0', 115200) as port:
+#     for frame in u.read(port):
+#         print(frame.seq, max(frame.re))
+
+import array
+import struct
+
+HEADER = '<2sBBIffff'
+HDRSIZE = struct.calcsize(HEADER)
+MAGIC = b'DF'
+F_INT16 = 1
+F_DELTA = 2
+F_IMAG = 4
+MAXLENGTH = 65536               # Longest transform accepted
+
+class Frame:
+    def __init__(self, seq, length, rate, dboffset, re, im, delta):
+        self.seq = seq                  # Sequence no. (modulo 256)
+        self.length = length            # Transform length
+        self.rate = rate                # Sample rate
+        self.dboffset = dboffset
+        self.re = re                    # List of length/2 floats
+        self.im = im                    # As above or None if not sent
+        self.delta = delta              # True if sent as a delta frame
+
+class Unpacker:
+    def __init__(self):
+        self._prev = None               # Quantised values of last frame
+        self._seq = None
+
+    # Size in bytes of a frame given its header.
+    @staticmethod
+    def size(header):
+        flags = header[2]
+        length = struct.unpack_from('<I', header, 4)[0]
+        nvals = length if flags & F_IMAG else length//2
+        return HDRSIZE + (nvals if flags & F_DELTA or not flags & F_INT16 else nvals*2)
+
+    # True if a header is plausible: magic, known flags, a power of 2 length no
+    # greater than MAXLENGTH and positive quantisation steps. The frame size is
+    # computed from the header so it must be checked before the payload is read.
+    @staticmethod
+    def valid(header):
+        magic, flags, seq, length, rate, dboffset, restep, imstep = \
+            struct.unpack_from(HEADER, header, 0)
+        return (magic == MAGIC and not flags & ~(F_INT16 | F_DELTA | F_IMAG)
+                and 2 <= length <= MAXLENGTH and not length & (length - 1)
+                and restep > 0 and imstep > 0)
+
+    # Decode a frame (bytes-like). Raises ValueError on a bad frame or if a delta
+    # frame does not follow its predecessor: decoding resumes at the next key
+    # frame.
+    def decode(self, buf):
+        if not self.valid(buf):
+            raise ValueError('Bad header')
+        magic, flags, seq, length, rate, dboffset, restep, imstep = \
+            struct.unpack_from(HEADER, buf, 0)
+        if len(buf) < self.size(buf):
+            raise ValueError('Short frame')
+        bins = length//2
+        nvals = length if flags & F_IMAG else bins
+        delta = bool(flags & F_DELTA)
+        if delta:
+            if self._prev is None or len(self._prev) != nvals or seq != (self._seq + 1) & 0xff:
+                self._prev = None
+                raise ValueError('Delta frame without predecessor')
+            d = array.array('b', buf[HDRSIZE:HDRSIZE + nvals])
+            q = [((p + c + 0x8000) & 0xffff) - 0x8000 for p, c in zip(self._prev, d)]
+        else:
+            q = array.array('h' if flags & F_INT16 else 'b')
+            q.frombytes(bytes(buf[HDRSIZE:self.size(buf)]))
+            if q.itemsize > 1 and struct.pack('=h', 1) != struct.pack('<h', 1):
+                q.byteswap()  # Big-endian host
+            q = list(q)
+        self._prev = q
+        self._seq = seq
+        re = [x*restep for x in q[:bins]]
+        im = [x*imstep for x in q[bins:]] if flags & F_IMAG else None
+        return Frame(seq, length, rate, dboffset, re, im, delta)
+
+    # Generator yielding frames read from a stream with a read(n) method e.g. a
+    # file or serial port. Resynchronises on the magic bytes after an error.
+    # Frames which cannot be decoded are skipped.
+    def read(self, stream):
+        buf = b''
+        while True:
+            while len(buf) < HDRSIZE:
+                data = stream.read(HDRSIZE - len(buf))
+                if not data:
+                    return
+                buf += data
+            idx = buf.find(MAGIC)
+            if idx != 0:  # Resynchronise
+                buf = buf[idx:] if idx > 0 else buf[-1:]
+                continue
+            if not self.valid(buf):  # Corrupt header: don't trust its size
+                buf = buf[2:]
+                continue
+            size = self.size(buf)
+            while len(buf) < size:
+                data = stream.read(size - len(buf))
+                if not data:
+                    return
+                buf += data
+            try:
+                frame = self.decode(buf[:size])
+            except ValueError:
+                buf = buf[2:]
+                continue
+            buf = buf[size:]
+            yield frame
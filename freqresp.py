@@ -0,0 +1,175 @@
+# freqresp.py Frequency response measurement using the Pyboard DAC and ADC
+# 19th Oct 2026
+# Released under the MIT license.
+
+# A stimulus is output on a DAC and the response of the system under test is
+# acquired on an ADC. Both are clocked by the same timer so acquisition is
+# synchronous with the stimulus. The stimulus is periodic with a period equal to
+# the transform length and is repeated for a number of settling periods before
+# the final period is analysed. The transfer function H = Y/X is calculated for
+# each bin, where X is the spectrum of the stimulus and Y that of the response.
+# X is calculated once and cached, so a measurement costs one capture and one
+# fft() per average. The start of an ADC capture is not locked to that of the
+# DAC output: the offset may vary by a sample or so between captures, which
+# appears as a linear phase in H. When averaging, H is calculated for each
+# capture and its offset relative to the first is measured and removed before
+# it is accumulated.
+
+import array
+import math
+import pyb
+from uctypes import addressof
+from dftclass import DFT, DFTADC, FORWARD, HREVERSE, POLAR
+from window import icopy, setarray, accumulate, cmul
+
+MULTITONE = const(0)    # Sum of tones with Schroeder phases
+CHIRP     = const(1)    # Linear frequency sweep
+MLS       = const(2)    # Maximum length sequence
+
+DAC_MID = const(2048)   # DAC is used in 12 bit mode
+
+# Feedback masks for Galois LFSR's generating maximum length sequences. Key is
+# the no. of bits: sequence length is 2**bits - 1.
+MLS_TAPS = {2: 0x3, 3: 0x6, 4: 0xc, 5: 0x14, 6: 0x30, 7: 0x60, 8: 0xb8, 9: 0x110,
+            10: 0x240, 11: 0x500, 12: 0x829, 13: 0x100d, 14: 0x2015, 15: 0x6000,
+            16: 0xd008}
+
+# Stimulus arrays and reciprocal spectra are shared by instances with the same
+# length and stimulus parameters.
+_cache = {}
+
+class FreqResp(DFTADC):
+    def __init__(self, length, adcpin, rate, stimulus=MULTITONE, bins=None,
+                 amplitude=1000, settle=1, dac=1, timer=6):
+        super().__init__(length, adcpin, timer=timer)
+        self.rate = rate                # Sample rate (Hz)
+        self.dboffset = 0               # H is a ratio: 0dB == unity gain
+        if isinstance(dac, pyb.DAC):
+            self.dac = dac
+        else:
+            self.dac = pyb.DAC(dac, bits=12)
+        half = length//2
+        self.accre = array.array('f', (0 for x in range(half)))  # Accumulated H
+        self.accim = array.array('f', (0 for x in range(half)))
+        # Capture buffer holds the settling periods and the one to be analysed
+        self.buff = array.array('i', (0 for x in range((settle + 1)*length)))
+        self.response = memoryview(self.buff)[settle*length:]
+        key = (length, stimulus, None if bins is None else tuple(bins), amplitude, settle)
+        if key not in _cache:
+            _cache[key] = self._stimulus(stimulus, bins, amplitude, settle)
+        self.stim, self.xinv = _cache[key]
+        # Control array for cmul(): H = Y * (1/X) in place in 1st half of re, im
+        self.mulctrl = array.array('i', [half, addressof(self.re), addressof(self.im),
+                                         addressof(self.xinv), addressof(self.re),
+                                         addressof(self.im)])
+
+    def attach(self, re=None, im=None):  # H is written to the attached buffers
+        super().attach(re, im)
+        ctrl = self.mulctrl
+        ctrl[1] = ctrl[4] = addressof(self.re)
+        ctrl[2] = ctrl[5] = addressof(self.im)
+
+    # Create the stimulus and the reciprocal of its spectrum. The spectrum is
+    # that of the integer values output to the DAC.
+    def _stimulus(self, stimulus, bins, amplitude, settle):
+        n = self._length
+        half = n//2
+        if bins is None:
+            bins = range(1, half)
+        if stimulus == MULTITONE:  # Synthesise by inverse transform
+            setarray(self.re, 0, n)
+            setarray(self.im, 0, n)
+            k = len(bins)
+            for i, b in enumerate(bins):
+                ph = -math.pi*i*(i - 1)/k  # Schroeder phase: low crest factor
+                self.re[b] = math.cos(ph)
+                self.im[b] = math.sin(ph)
+            DFT.run(self, HREVERSE)
+        elif stimulus == CHIRP:  # Sweep from lowest to highest bin frequency
+            f0 = min(bins)
+            df = max(bins) - f0
+            for x in range(n):
+                self.re[x] = math.sin(2*math.pi*(f0 + df*x/(2*n))*x/n)
+        elif stimulus == MLS:  # Length n - 1 padded with a zero: spectrum is not flat
+            bits = round(math.log(n)/math.log(2))
+            taps = MLS_TAPS[bits]
+            lfsr = 1
+            for x in range(n - 1):
+                self.re[x] = 1 if lfsr & 1 else -1
+                lfsr = (lfsr >> 1) ^ taps if lfsr & 1 else lfsr >> 1
+            self.re[n - 1] = 0
+        else:
+            raise ValueError('Unknown stimulus')
+        peak = max(abs(x) for x in self.re)
+        stim = array.array('H', (0 for x in range((settle + 1)*n)))
+        for x in range(n):
+            v = DAC_MID + round(amplitude*self.re[x]/peak)
+            for p in range(settle + 1):
+                stim[x + p*n] = v
+            self.re[x] = v
+        DFT.run(self, FORWARD)  # Spectrum of stimulus as output
+        xinv = array.array('f', (0 for x in range(n)))  # (real, imag) pairs
+        power = [self.re[x]**2 + self.im[x]**2 for x in range(half)]
+        thresh = max(power[1:])*1e-6  # Bins more than 60dB down are not excited
+        for x in range(1, half):  # DC is excluded
+            if power[x] > thresh:
+                xinv[2*x] = self.re[x]/power[x]
+                xinv[2*x + 1] = -self.im[x]/power[x]
+        return stim, xinv
+
+    # Measure the response, averaging navg captures. On completion the first
+    # half of re and im hold H as modified by conversion.
+    def measure(self, conversion=POLAR, navg=1):
+        n = self._length
+        half = n//2
+        tim = self.timer
+        setarray(self.accre, 0, half)
+        setarray(self.accim, 0, half)
+        self.scale = 1/(n*navg)         # Accumulated result is the mean of H
+        for i in range(navg):
+            tim.deinit()
+            tim.init(freq=self.rate)
+            self.dac.write_timed(self.stim, tim, mode=pyb.DAC.NORMAL)
+            self.adc.read_timed(self.buff, tim) # Note: blocks
+            icopy(self.response, self.re, n)
+            DFT.run(self, FORWARD)
+            cmul(self.mulctrl)          # H = Y/X for this capture
+            if i:
+                self._align(half)
+            accumulate(self.accre, self.re, half)
+            accumulate(self.accim, self.im, half)
+        self.scale = 1/n
+        setarray(self.re, 0, half)
+        setarray(self.im, 0, half)
+        accumulate(self.re, self.accre, half)
+        accumulate(self.im, self.accim, half)
+        self.convert(conversion)
+
+    # Remove the difference between the start offset of the capture whose H is
+    # in re, im and that of the accumulated captures. A delay of d samples
+    # multiplies bin k by exp(-2j*pi*k*d/n): d is estimated from the mean phase
+    # increment between adjacent excited bins of H*conj(acc), rounded to an
+    # integer and removed by rotating H. Returns d.
+    def _align(self, half):
+        n = self._length
+        re, im = self.re, self.im
+        ar, ai = self.accre, self.accim
+        zr = zi = pr = pi = 0.0
+        for k in range(1, half):
+            qr = re[k]*ar[k] + im[k]*ai[k]  # q = H*conj(acc)
+            qi = im[k]*ar[k] - re[k]*ai[k]
+            zr += qr*pr + qi*pi         # z += q*conj(previous q)
+            zi += qi*pr - qr*pi
+            pr, pi = qr, qi
+        d = round(-math.atan2(zi, zr)*n/(2*math.pi))
+        if d:
+            wr = math.cos(2*math.pi*d/n)  # Rotation per bin
+            wi = math.sin(2*math.pi*d/n)
+            cr, ci = wr, wi
+            for k in range(1, half):
+                x = re[k]
+                y = im[k]
+                re[k] = x*cr - y*ci
+                im[k] = x*ci + y*cr
+                cr, ci = cr*wr - ci*wi, cr*wi + ci*wr
+        return d
@@ -7,24 +7,44 @@
 # arctan(q) = q*pi/4- q*(q - 1)*(0.2447 + 0.0663*q)
 # Arctan approximation: max error about 0.085 deg in my tests.
 
+# Precision tiers. Max errors measured with dftaccuracy.py and against
+# math.atan2() over all four quadrants.
+# FAST: arctan(q) = q*(1.0546812 - 0.265935*q) max error 0.19 deg.
+# STANDARD: the above approximation, max error 0.086 deg.
+# PRECISE: 9th order minimax polynomial (Abramowitz and Stegun 4.4.47)
+# arctan(q) = q*(a1 + a3*q**2 + a5*q**4 + a7*q**6 + a9*q**8) max error 0.0007 deg.
+# NOSQRT may be ORed with any of the above. It replaces the square root in the
+# magnitude calculation with an alpha max plus beta min estimate:
+# mag = 0.96043387*max(|x|, |y|) + 0.39782473*min(|x|, |y|) max error 3.96%.
+FAST = const(0)
+STANDARD = const(1)
+PRECISE = const(2)
+NOSQRT = const(4)
+
 from math import pi
 from array import array
-consts = array('f', [0.0, 0.0, 1.0, pi, pi/2, -pi/2, pi/4, 0.2447, 0.0663])
+consts = array('f', [0.0, 0.0, 1.0, pi, pi/2, -pi/2, pi/4, 0.2447, 0.0663,
+                     1.0546812, 0.265935,  # FAST
+                     0.9998660, -0.3302995, 0.1801410, -0.0851330, 0.0208351,  # PRECISE
+                     0.96043387, 0.39782473])  # NOSQRT alpha, beta
 
 # Entry:
 # r0: array of real (x) values
 # r1: array of imaginary (y) values
 # r2: array element 0 = length of arrays following are constants
+# r3: precision tier, optionally ORed with NOSQRT
 # ARM CPU register usage
 # r3: Array length (integer)
 # r4: Negate flag
 # r5, r6: Temporary storage
+# r7: Precision tier
 # Returns:
 # The real array holds magnitude values, the imaginary ones phase.
 # Phase is in radians compatible with cPython's math.atan2()
 
 @micropython.asm_thumb
-def polar(r0, r1, r2):    # Array length in r3: convert to integer
+def polar(r0, r1, r2, r3):    # Array length in r3: convert to integer
+    mov(r7, r3)
     vldr(s15, [r2, 0])
     vcvt_s32_f32(s15, s15)
     vmov(r3, s15)
@@ -35,8 +55,15 @@ def polar(r0, r1, r2):    # Array length in r3: convert to integer
     vldr(s3, [r2, 16])       # Pi/2
     vldr(s4, [r2, 20])       # -Pi/2
     vldr(s5, [r2, 24])       # Pi/4
-    vldr(s6, [r2, 28])       # 0.2447
-    vldr(s7, [r2, 32])       # 0.0663
+    vldr(s6, [r2, 28])       # 0.2447 (FAST: 1.0546812)
+    vldr(s7, [r2, 32])       # 0.0663 (FAST: 0.265935)
+    mov(r5, 3)
+    and_(r5, r7)
+    cmp(r5, 0)               # FAST
+    bne(P08)
+    vldr(s6, [r2, 36])       # 1.0546812
+    vldr(s7, [r2, 40])       # 0.265935
+    label(P08)
     b(START)
 
     label(DOCALC)
@@ -44,11 +71,15 @@ def polar(r0, r1, r2):    # Array length in r3: convert to integer
     vldr(s14, [r0, 0])      # x
     vldr(s15, [r1, 0])      # y
 # Calculate magnitude
+    mov(r5, 4)              # NOSQRT: estimate is calculated in octant zero
+    tst(r5, r7)
+    bne(P05)
     vmul(s10, s14, s14)
     vmul(s9, s15, s15)
     vadd(s10, s10, s9)
     vsqrt(s10, s10)
     vstr(s10, [r0, 0])      # real = hypot
+    label(P05)
 
 # Start of arctan calculation
     mov(r4, 0)              # Negate flag
@@ -60,9 +91,20 @@ def polar(r0, r1, r2):    # Array length in r3: convert to integer
     vmrs(APSR_nzcv, FPSCR)  # transfer status to ARM status registers
     bne(P01)
     vstr(s0, [r1,0])        # result = 0
+    tst(r5, r7)             # NOSQRT: magnitude = 0
+    it(ne)
+    vstr(s0, [r0,0])
     b(Q0DONE)
 
     label(P01)
+    tst(r5, r7)             # NOSQRT: magnitude = |y|
+    beq(P06)
+    vmov(r5, s15)
+    mov(r6, 1)
+    lsl(r5, r6)             # Clear sign bit
+    lsr(r5, r6)
+    str(r5, [r0, 0])
+    label(P06)
     vcmp(s15, s0)
     vmrs(APSR_nzcv, FPSCR)  # transfer status to ARM status registers
     ite(ge)
@@ -117,9 +159,49 @@ def polar(r0, r1, r2):    # Array length in r3: convert to integer
     ite(eq)
     mov(r4, 1)
     mov(r4, 0)              # neg = not neg
-# Octant zero
-    label(OCTZERO)          # calculate r = x*pi/4 - x*(x - 1)*(0.2447 + 0.0663*x)
+# Octant zero: x = max(|x|, |y|), y = min(|x|, |y|)
+    label(OCTZERO)
+    mov(r5, 4)              # NOSQRT
+    tst(r5, r7)
+    beq(P07)
+    vldr(s12, [r2, 64])     # mag = alpha*x + beta*y
+    vmul(s10, s14, s12)
+    vldr(s12, [r2, 68])
+    vmul(s9, s15, s12)
+    vadd(s10, s10, s9)
+    vstr(s10, [r0, 0])
+    label(P07)
     vdiv(s14, s15, s14)     #  x = y/x
+    mov(r5, 3)
+    and_(r5, r7)            # Precision tier
+    cmp(r5, 1)              # STANDARD
+    beq(STDTIER)
+    bgt(PRECTIER)
+                            # FAST: r = x*(1.0546812 - 0.265935*x)
+    vmul(s15, s7, s14)      # s15 = 0.265935*x
+    vsub(s15, s6, s15)      # s15 = 1.0546812 - 0.265935*x
+    vmul(s15, s14, s15)
+    b(ADDC)
+
+    label(PRECTIER)         # PRECISE: Horner's method in x**2
+    vmul(s13, s14, s14)     # s13 = x**2
+    vldr(s15, [r2, 60])     # a9
+    vldr(s12, [r2, 56])     # a7
+    vmul(s15, s15, s13)
+    vadd(s15, s15, s12)
+    vldr(s12, [r2, 52])     # a5
+    vmul(s15, s15, s13)
+    vadd(s15, s15, s12)
+    vldr(s12, [r2, 48])     # a3
+    vmul(s15, s15, s13)
+    vadd(s15, s15, s12)
+    vldr(s12, [r2, 44])     # a1
+    vmul(s15, s15, s13)
+    vadd(s15, s15, s12)
+    vmul(s15, s15, s14)
+    b(ADDC)
+
+    label(STDTIER)          # calculate r = x*pi/4 - x*(x - 1)*(0.2447 + 0.0663*x)
     vmul(s15, s7, s14)      #  s15 = 0.0663x
     vadd(s15, s6, s15)      # s15 = 0.2447 + 0.0663*x
     vsub(s13, s14, s1)      # s1 = x -1
@@ -128,6 +210,7 @@ def polar(r0, r1, r2):    # Array length in r3: convert to integer
     vmul(s13, s14, s5)      # s5 = x*pi/4
     vsub(s15, s13, s15)
 
+    label(ADDC)
     vadd(s15, s15, s8)      # s15 += c
     cmp(r4, 0)
     it(ne)
@@ -143,6 +226,225 @@ def polar(r0, r1, r2):    # Array length in r3: convert to integer
     sub(r3, 1)
     bne(START)
 
-def topolar(re, im, length):
+def topolar(re, im, length, precision=STANDARD):
     consts[0] = length
-    polar(re, im, consts)
+    polar(re, im, consts, precision)
+
+# Phase unwrapping. Runs after polar conversion: removes the 2*pi jumps from the
+# phase values in the imaginary array. Bins whose magnitude is <= threshold are
+# ignored: their phase is replaced with that of the last valid bin, and the
+# following valid bin is unwrapped relative to that bin.
+# Optionally the unwrapped phase is replaced by group delay (the negative of
+# the derivative of phase with respect to frequency) in units of the sample
+# period. Ignored bins have zero group delay. The first valid bin has no
+# predecessor: it is assigned the group delay of the second.
+uwconsts = array('f', [0.0, 0.0, 2*pi, pi, -pi, 0.0, 0.0])
+
+# Entry:
+# r0: array of magnitudes (real array after polar conversion)
+# r1: array of phases (imaginary array after polar conversion)
+# r2: array: length, threshold, 2*pi, pi, -pi, group delay scale, 0.0
+# r3: 0 for unwrapped phase, 1 for group delay
+# ARM CPU register usage
+# r3: Array length (integer)
+# r4: State: 0 no valid bin yet, 1 one valid bin, 2 more than one
+# r5: Bins since last valid bin
+# r6: Address of phase of first valid bin
+# r7: Group delay flag
+# FPU register usage
+# s0: threshold s1: raw phase of last valid bin s2: offset (multiple of 2*pi)
+# s3: unwrapped phase of last valid bin s4: 2*pi s5: pi s6: -pi
+# s7: group delay scale s8: 0.0
+
+@micropython.asm_thumb
+def unwrapper(r0, r1, r2, r3):
+    mov(r7, r3)
+    vldr(s15, [r2, 0])
+    vcvt_s32_f32(s15, s15)
+    vmov(r3, s15)           # Array length
+    vldr(s0, [r2, 4])       # Threshold
+    vldr(s4, [r2, 8])       # 2*pi
+    vldr(s5, [r2, 12])      # pi
+    vldr(s6, [r2, 16])      # -pi
+    vldr(s7, [r2, 20])      # Group delay scale
+    vldr(s8, [r2, 24])      # 0.0
+    vldr(s2, [r2, 24])      # offset = 0
+    vldr(s3, [r2, 24])      # last unwrapped phase = 0
+    mov(r4, 0)
+    mov(r5, 0)
+
+    label(LOOP)
+    add(r5, 1)              # Bins since last valid bin
+    vldr(s14, [r0, 0])      # Magnitude
+    vldr(s15, [r1, 0])      # Phase
+    vcmp(s14, s0)
+    vmrs(APSR_nzcv, FPSCR)
+    bgt(VALID)
+    cmp(r7, 0)              # Ignored bin
+    ite(eq)
+    vstr(s3, [r1, 0])       # Hold phase
+    vstr(s8, [r1, 0])       # Zero group delay
+    b(NEXT)
+
+    label(VALID)
+    cmp(r4, 0)
+    bne(P01)
+    mov(r4, 1)              # First valid bin
+    mov(r6, r1)
+    vadd(s3, s15, s2)       # Unwrapped phase = phase
+    vadd(s1, s15, s8)       # Save raw phase
+    cmp(r7, 0)
+    ite(eq)
+    vstr(s3, [r1, 0])
+    vstr(s8, [r1, 0])
+    mov(r5, 0)
+    b(NEXT)
+
+    label(P01)
+    vsub(s13, s15, s1)      # Change in raw phase
+    vadd(s1, s15, s8)       # Save raw phase
+    vcmp(s13, s5)
+    vmrs(APSR_nzcv, FPSCR)
+    ble(P02)
+    vsub(s2, s2, s4)        # Jump > pi: offset -= 2*pi
+    b(P03)
+    label(P02)
+    vcmp(s13, s6)
+    vmrs(APSR_nzcv, FPSCR)
+    bge(P03)
+    vadd(s2, s2, s4)        # Jump < -pi: offset += 2*pi
+    label(P03)
+    vadd(s15, s15, s2)      # Unwrapped phase
+    cmp(r7, 0)
+    bne(DELAY)
+    vstr(s15, [r1, 0])
+    vadd(s3, s15, s8)
+    mov(r5, 0)
+    b(NEXT)
+
+    label(DELAY)
+    vsub(s13, s15, s3)      # Change in unwrapped phase
+    vadd(s3, s15, s8)
+    vmov(s12, r5)
+    vcvt_f32_s32(s12, s12)  # Bins since last valid bin
+    vdiv(s13, s13, s12)
+    vmul(s13, s13, s7)      # Group delay
+    vstr(s13, [r1, 0])
+    cmp(r4, 1)
+    bne(P04)
+    vstr(s13, [r6, 0])      # Second valid bin: set delay of first
+    mov(r4, 2)
+    label(P04)
+    mov(r5, 0)
+
+    label(NEXT)
+    add(r0, 4)
+    add(r1, 4)
+    sub(r3, 1)
+    bne(LOOP)
+
+# length is the number of bins to process: normally half the transform length
+# as conjugates are ignored. Group delay is in units of the sample period.
+def unwrap(re, im, length, threshold=0.0, delay=False):
+    uwconsts[0] = length
+    uwconsts[1] = threshold
+    uwconsts[5] = -length/pi  # Bin spacing is pi/length radians per sample
+    unwrapper(re, im, uwconsts, 1 if delay else 0)
+
+# Power spectrum: re = re**2 + im**2, im = 0.
+# r0: real array
+# r1: imaginary array
+# r2: length
+@micropython.asm_thumb
+def powerspec(r0, r1, r2):
+    mov(r3, 0)
+    vmov(s2, r3)            # 0.0
+    label(LOOP)
+    vldr(s0, [r0, 0])
+    vmul(s0, s0, s0)
+    vldr(s1, [r1, 0])
+    vmul(s1, s1, s1)
+    vadd(s0, s0, s1)
+    vstr(s0, [r0, 0])
+    vstr(s2, [r1, 0])
+    add(r0, 4)
+    add(r1, 4)
+    sub(r2, 1)
+    bgt(LOOP)
+
+# Log magnitude: re = scale * ln(sqrt(re**2 + im**2)), im = 0.
+# p = re**2 + im**2 is split into exponent e and mantissa m, with m adjusted to
+# lie in sqrt(0.5)..sqrt(2). Then ln(p) = e*ln(2) + ln(m) where
+# ln(m) = 2*atanh(t) = 2*t*(1 + t**2/3 + t**4/5 + t**6/7 + t**8/9) with
+# t = (m - 1)/(m + 1). |t| < 0.172 so the error is below 1e-7.
+# A zero magnitude produces -44.0*scale (p treated as 2**-127).
+# r0: real array
+# r1: imaginary array
+# r2: length
+# r3: array of constants: ln(2)/2, sqrt(2), 0.5, 1.0, 1/3, 1/5, 1/7, 1/9, 0.0, scale
+@micropython.asm_thumb
+def logmagnitude(r0, r1, r2, r3):
+    mov(r6, 1)
+    lsl(r7, r6, 23)
+    sub(r7, r7, r6)         # Mantissa mask 0x7fffff
+    mov(r6, 127)
+    lsl(r6, r6, 23)         # Exponent of 1.0
+    vldr(s6, [r3, 0])
+    vldr(s7, [r3, 4])
+    vldr(s8, [r3, 8])
+    vldr(s9, [r3, 12])
+    vldr(s10, [r3, 16])
+    vldr(s11, [r3, 20])
+    vldr(s12, [r3, 24])
+    vldr(s13, [r3, 28])
+    vldr(s14, [r3, 32])
+    vldr(s15, [r3, 36])
+    label(LOOP)
+    vldr(s0, [r0, 0])
+    vmul(s0, s0, s0)
+    vldr(s1, [r1, 0])
+    vmul(s1, s1, s1)
+    vadd(s0, s0, s1)        # p
+    vmov(r4, s0)
+    lsr(r5, r4, 23)
+    sub(r5, 127)            # Exponent
+    and_(r4, r7)
+    orr(r4, r6)
+    vmov(s1, r4)            # Mantissa 1.0 <= m < 2.0
+    vmov(s2, r5)
+    vcvt_f32_s32(s2, s2)
+    vcmp(s1, s7)
+    vmrs(APSR_nzcv, FPSCR)
+    ble(P01)
+    vmul(s1, s1, s8)        # m > sqrt(2): halve m, increment exponent
+    vadd(s2, s2, s9)
+    label(P01)
+    vsub(s3, s1, s9)
+    vadd(s4, s1, s9)
+    vdiv(s3, s3, s4)        # t
+    vmul(s4, s3, s3)        # t**2
+    vmul(s5, s4, s13)
+    vadd(s5, s5, s12)
+    vmul(s5, s5, s4)
+    vadd(s5, s5, s11)
+    vmul(s5, s5, s4)
+    vadd(s5, s5, s10)
+    vmul(s5, s5, s4)
+    vadd(s5, s5, s9)
+    vmul(s5, s5, s3)        # ln(m)/2
+    vmul(s2, s2, s6)        # e*ln(2)/2
+    vadd(s5, s5, s2)        # ln(p)/2 == ln(magnitude)
+    vmul(s5, s5, s15)
+    vstr(s5, [r0, 0])
+    vstr(s14, [r1, 0])
+    add(r0, 4)
+    add(r1, 4)
+    sub(r2, 1)
+    bgt(LOOP)
+
+lgconsts = array('f', [0.34657359, 1.41421356, 0.5, 1.0, 1/3, 1/5, 1/7, 1/9, 0.0, 1.0])
+
+# Convert the first length elements of re to log magnitude multiplied by scale.
+def logmag(re, im, length, scale=1.0):
+    lgconsts[9] = scale
+    logmagnitude(re, im, length, lgconsts)
@@ -0,0 +1,176 @@
+# trigger.py Event triggered spectrum capture using the Pyboard ADC
+# 19th Oct 2026
+# Released under the MIT license.
+
+# The ADC is sampled continuously by a timer interrupt into a ring buffer. In
+# the background each block of samples is tested against a threshold. When the
+# threshold is exceeded a frame comprising pretrigger samples before the block
+# and the samples following it is transformed and the spectrum queued with a
+# timestamp. Frames are thus transformed only when something of interest occurs.
+# Tests are on the AC component of a block:
+# LEVEL  Peak deviation from the mean.
+# RMS    RMS value.
+# BAND   Amplitude of the components at one or more frequencies, measured by
+#        the Goertzel algorithm over the block. Each frequency has a bandwidth
+#        of rate/block with -13dB sidelobes. A sinewave at the frequency reads
+#        as its peak value if it completes a whole no. of cycles per block. One
+#        offset by rate/(2*block) reads 0.64 of this.
+# Thresholds are in ADC counts. The ring buffer and queue are allocated by the
+# constructor: no allocation occurs in the interrupt handler. The kernels are in
+# blockstats.py or, where the assembler is unavailable, dftpy.py.
+
+import array
+import math
+import utime
+from uctypes import addressof
+import dftclass
+from dftclass import DFT, DFTADC, DB
+try:
+    from blockstats import blockstats, goertzel
+except (ImportError, SyntaxError):  # No assembler
+    from dftpy import blockstats, goertzel
+
+LEVEL = const(0)
+RMS   = const(1)
+BAND  = const(2)
+
+class TriggerADC(DFTADC):
+    # length: transform length. adcpin, winfunc, timer: as per DFTADC.
+    # rate: sample rate (Hz). mode: LEVEL, RMS or BAND. threshold: ADC counts.
+    # freqs: BAND mode frequencies (Hz). pretrigger: samples preceding the
+    # triggering block (default length//4). block: samples per test, a power of
+    # 2 <= length. depth: no. of queued spectra. conversion: as per DFT.run().
+    def __init__(self, length, adcpin, rate, mode=LEVEL, threshold=100, freqs=(),
+                 pretrigger=None, block=32, depth=4, conversion=DB, winfunc=None, timer=6):
+        super().__init__(length, adcpin, winfunc=winfunc, timer=timer)
+        if block > length or block & (block - 1):
+            raise ValueError('Block must be a power of 2 <= length')
+        if mode == BAND and not freqs:
+            raise ValueError('BAND mode requires frequencies')
+        self.rate = rate
+        self.mode = mode
+        self.threshold = threshold
+        self.conversion = conversion
+        self.pretrigger = length//4 if pretrigger is None else pretrigger
+        if not 0 <= self.pretrigger <= length - block:
+            raise ValueError('Pretrigger must be in range 0 to length - block')
+        self.block = block
+        size = 2*length                 # Frame plus margin for samples arriving during a copy
+        self.ring = array.array('i', (2048 for _ in range(size)))
+        self._mask = size - 1
+        self._widx = 0                  # Written by ISR
+        self._ridx = 0                  # Start of next block to test
+        self._rmv = memoryview(self.ring)
+        self._bmv = memoryview(self.buff)
+        self._isrfunc = self._isr       # Bound method is created once
+        self._res = array.array('f', (0 for _ in range(4)))
+        self._sctrl = array.array('i', [block, addressof(self.ring), addressof(self._res), 2048])
+        self._coeffs = array.array('f', (2*math.cos(2*math.pi*f/rate) for f in freqs))
+        self._power = array.array('f', [0])
+        self._gctrl = array.array('i', [block, addressof(self.ring), addressof(self._coeffs),
+                                        2048, len(self._coeffs), addressof(self._power)])
+        self.value = 0.0                # Measurement of most recent block
+        self._trig = None               # Ring index of the start of a pending frame
+        self._tlevel = 0.0
+        # Queue of spectra: first half of re and im as transformed
+        half = length//2
+        self._qre = [array.array('f', (0 for _ in range(half))) for _ in range(depth)]
+        self._qim = [array.array('f', (0 for _ in range(half))) for _ in range(depth)]
+        self._qts = [0]*depth           # Timestamps (ms)
+        self._qlevel = [0.0]*depth      # Measurement which caused each trigger
+        self._qhead = 0                 # Next slot to read
+        self._qcount = 0
+        self.lost = 0                   # Events discarded because the queue was full
+
+    # Hard IRQ: one sample per timer tick
+    def _isr(self, tim):
+        self.ring[self._widx] = self.adc.read()
+        self._widx = (self._widx + 1) & self._mask
+
+    def start(self):
+        tim = self.timer
+        tim.deinit()
+        tim.init(freq=self.rate)
+        tim.callback(self._isrfunc)
+
+    def stop(self):
+        self.timer.callback(None)
+        self.timer.deinit()
+
+    # Test a block of samples starting at ring index idx. Returns the
+    # measurement in ADC counts.
+    def _measure(self, idx):
+        n = self.block
+        ctrl = self._sctrl
+        ctrl[1] = addressof(self.ring) + 4*idx
+        blockstats(ctrl)
+        res = self._res
+        mean = res[0]/n
+        if self.mode == LEVEL:
+            value = max(res[2] - mean, mean - res[3])
+        elif self.mode == RMS:
+            value = math.sqrt(max(res[1]/n - mean*mean, 0.0))
+        else:
+            gctrl = self._gctrl
+            gctrl[1] = ctrl[1]
+            gctrl[3] = ctrl[3]
+            goertzel(gctrl)
+            value = 2*math.sqrt(max(self._power[0], 0.0))/n
+        ctrl[3] += round(mean)          # Track the DC level for the next block
+        return value
+
+    # Process any complete blocks. Call frequently: the ring holds 2*length
+    # samples. Returns True if a spectrum was queued.
+    def poll(self):
+        mask = self._mask
+        n = self.block
+        if self._trig is None:
+            while ((self._widx - self._ridx) & mask) >= n:
+                idx = self._ridx
+                self.value = self._measure(idx)
+                self._ridx = (idx + n) & mask
+                if self.value > self.threshold:
+                    self._trig = (idx - self.pretrigger) & mask
+                    self._tlevel = self.value
+                    break
+            if self._trig is None:
+                return False
+        start = self._trig
+        length = self._length
+        lag = (self._widx - start) & mask   # Samples acquired since frame start
+        if lag < length:
+            return False                    # Awaiting post-trigger samples
+        ts = utime.ticks_add(utime.ticks_ms(), -(((lag - self.pretrigger)*1000)//self.rate))
+        first = min(length, mask + 1 - start)
+        self._bmv[:first] = self._rmv[start : start + first]
+        if first < length:
+            self._bmv[first : length] = self._rmv[: length - first]
+        self._trig = None
+        self._ridx = ((start + length + n - 1) & mask) & -n  # Resume testing after the frame
+        if self._qcount == len(self._qts):
+            self.lost += 1
+            return False
+        dftclass._load(self.conversion)
+        dftclass.icopy(self.buff, self.re, length)
+        DFT.run(self, self.conversion)
+        slot = (self._qhead + self._qcount) % len(self._qts)
+        half = length//2
+        memoryview(self._qre[slot])[:] = memoryview(self.re)[:half]
+        memoryview(self._qim[slot])[:] = memoryview(self.im)[:half]
+        self._qts[slot] = ts
+        self._qlevel[slot] = self._tlevel
+        self._qcount += 1
+        return True
+
+    def __len__(self):
+        return self._qcount
+
+    # Oldest queued spectrum as (timestamp, measurement, re, im) or None. re and
+    # im are the first half of the arrays and are reused when the slot is.
+    def get(self):
+        if not self._qcount:
+            return None
+        slot = self._qhead
+        self._qhead = (slot + 1) % len(self._qts)
+        self._qcount -= 1
+        return self._qts[slot], self._qlevel[slot], self._qre[slot], self._qim[slot]
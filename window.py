@@ -73,3 +73,88 @@ def icopy(r0, r1, r2):
     add(r1, 4)
     sub(r2, 1)
     bgt(LOOP)
+
+# Add each element of float array 1 to the corresponding one in array 0
+# r0: array 0 (accumulator)
+# r1: array 1
+# r2: length of arrays
+@micropython.asm_thumb
+def accumulate(r0, r1, r2):
+    label(LOOP)
+    vldr(s14, [r0, 0])
+    vldr(s15, [r1, 0])
+    vadd(s15, s14, s15)
+    vstr(s15, [r0, 0])
+    add(r0, 4)
+    add(r1, 4)
+    sub(r2, 1)
+    bgt(LOOP)
+
+# Complex multiply: dest = source * coefficient. Source and destination may be
+# the same arrays.
+# r0: integer control array
+# ctrl[0] = length
+# ctrl[1] = address of source real array
+# ctrl[2] = address of source imaginary array
+# ctrl[3] = address of coefficient array (real, imaginary pairs)
+# ctrl[4] = address of destination real array
+# ctrl[5] = address of destination imaginary array
+@micropython.asm_thumb
+def cmul(r0):
+    ldr(r5, [r0, 0])
+    ldr(r1, [r0, 4])
+    ldr(r2, [r0, 8])
+    ldr(r3, [r0, 12])
+    ldr(r4, [r0, 16])
+    ldr(r6, [r0, 20])
+    label(LOOP)
+    vldr(s10, [r1, 0])      # a
+    vldr(s11, [r2, 0])      # b
+    vldr(s12, [r3, 0])      # c
+    vldr(s13, [r3, 4])      # d
+    vmul(s14, s10, s12)     # ac
+    vmul(s15, s11, s13)     # bd
+    vsub(s14, s14, s15)     # real = ac - bd
+    vmul(s15, s10, s13)     # ad
+    vmul(s10, s11, s12)     # bc
+    vadd(s15, s15, s10)     # imag = ad + bc
+    vstr(s14, [r4, 0])
+    vstr(s15, [r6, 0])
+    add(r1, 4)
+    add(r2, 4)
+    add(r3, 8)
+    add(r4, 4)
+    add(r6, 4)
+    sub(r5, 1)
+    bgt(LOOP)
+
+# Strided copy of a pair of arrays e.g. to gather a column of a 2D array stored
+# by rows into contiguous arrays, or to scatter it back. Copies 32 bit words.
+# r0: integer control array
+# ctrl[0] = no. of elements
+# ctrl[1] = address of first source element (real)
+# ctrl[2] = address of first source element (imaginary)
+# ctrl[3] = source stride in bytes
+# ctrl[4] = address of first destination element (real)
+# ctrl[5] = address of first destination element (imaginary)
+# ctrl[6] = destination stride in bytes
+@micropython.asm_thumb
+def scopy(r0):
+    ldr(r1, [r0, 4])
+    ldr(r2, [r0, 8])
+    ldr(r3, [r0, 12])
+    ldr(r4, [r0, 16])
+    ldr(r5, [r0, 20])
+    ldr(r6, [r0, 24])
+    ldr(r0, [r0, 0])
+    label(LOOP)
+    ldr(r7, [r1, 0])
+    str(r7, [r4, 0])
+    ldr(r7, [r2, 0])
+    str(r7, [r5, 0])
+    add(r1, r1, r3)
+    add(r2, r2, r3)
+    add(r4, r4, r6)
+    add(r5, r5, r6)
+    sub(r0, 1)
+    bgt(LOOP)